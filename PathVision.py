@@ -1,17 +1,12 @@
-import math
-import random
-import threading
 import tkinter
-import time
-import sys
-
-import networkx as nx
+import tkinter.ttk
 
 from settings import *
 
-from modes.explorationMode import ExplorationMode
 from modes.simulationMode import SimulationMode
 
+INITIAL_EXAMPLE = "examples/quadratic.pv"
+
 class App(tkinter.Frame):
 
 	def __init__(self):
@@ -25,8 +20,9 @@ class App(tkinter.Frame):
 		self.setup_themes()
 		self.setup_menubar()
 
+		# The exploration mode is only built the first time it is activated
 		self.simulationMode = SimulationMode(self, self)
-		self.explorationMode = ExplorationMode(self, self)
+		self.explorationMode = None
 
 		# Setup window events
 		self.master.protocol("WM_DELETE_WINDOW", self.on_close)
@@ -35,11 +31,13 @@ class App(tkinter.Frame):
 		self.columnconfigure(0,weight=1)
 
 		self.activate_simulation()
-		self.simulationMode.storageController._load("examples/quadratic.pv")
-		#self.explorationMode.storageController._load("test.alg")
-		
-		tkinter.mainloop()
 
+		# The initial example is read in the background and only drawn once
+		# the window is up
+		self.load_initial_example()
+
+	def load_initial_example(self):
+		self.simulationMode.storageController.loadInBackground(INITIAL_EXAMPLE)
 
 	def setup_themes(self):
 		# Choose ttk themes
@@ -71,13 +69,18 @@ class App(tkinter.Frame):
 	################
 
 	def activate_simulation(self):
-		self.explorationMode.grid_remove()
+		if self.explorationMode is not None:
+			self.explorationMode.grid_remove()
 		self.simulationMode.grid(row=0, column=0, sticky="NESW")
 
 		self.simulationMode.activate()
 		self.currentMode = self.simulationMode
 
 	def activate_exploration(self):
+		if self.explorationMode is None:
+			from modes.explorationMode import ExplorationMode
+			self.explorationMode = ExplorationMode(self, self)
+
 		self.simulationMode.grid_remove()
 		self.explorationMode.grid(row=0, column=0, sticky="NESW")
 
@@ -96,7 +99,7 @@ class App(tkinter.Frame):
 		quit()
 
 if __name__ == '__main__':
-	App()
+	App().mainloop()
 
 
 """
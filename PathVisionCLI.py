@@ -0,0 +1,109 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import theory.bellmanFord as bellmanFord
+import theory.eventSimulator as eventSimulator
+import theory.numericBellmanFord as numericBellmanFord
+import theory.routingProblem as routingProblem
+
+# Solves saved routing problems without starting the GUI, printing one JSON
+# object per problem
+
+def routeToJSON(route):
+	if route is None or isinstance(route, int):
+		return route
+	return str(route)
+
+# The final state only includes the routes to the given destinations, which
+# are the only ones simulated by the asynchronous schedule
+def solveProblem(filename, limit, schedule=bellmanFord.SYNCHRONOUS, order=None, seed=None, destinations=None):
+	data    = routingProblem.loadProblem(filename)
+	algebra = routingProblem.problemAlgebra(data)
+	size    = routingProblem.problemSize(data)
+	if destinations is None:
+		destinations = list(range(size))
+	for j in destinations:
+		if not 0 <= j < size:
+			raise Exception("Destination " + str(j) + " is not a node of " + filename)
+
+	details = {}
+	if schedule == eventSimulator.ASYNCHRONOUS:
+		# The matrices are never built, so only the messages sent cost anything
+		neighbours = routingProblem.problemNeighbourLists(algebra, data)
+		simulator = eventSimulator.EventSimulator(algebra, neighbours, routingProblem.problemDelays(data), seed, destinations)
+		steps, clockTime = 0, 0.0
+		while steps < limit - 1 and simulator.step() is not None:
+			steps, clockTime = steps + 1, simulator.time
+		converged = simulator.hasConverged()
+		convergenceTime = steps if converged else None
+		finalState = [[simulator.getRoute(i, j) for j in destinations] for i in range(size)]
+		details = {"clockTime" : clockTime, "messages" : simulator.messages}
+	else:
+		adM = routingProblem.problemAdjacencyMatrix(algebra, data)
+		idM = bellmanFord.createIdentityMatrix(algebra, size)
+		if schedule == bellmanFord.SYNCHRONOUS:
+			engine = numericBellmanFord if numericBellmanFord.isApplicable(algebra) else bellmanFord
+			states = engine.solve(algebra, idM, idM, adM, limit)
+			converged = states[-1] == states[-2]
+			convergenceTime = len(states) - 2 if converged else None
+			finalState = states[-1]
+		else:
+			finalState, convergenceTime = bellmanFord.scheduledSolve(algebra, idM, idM, adM, schedule, order, limit)
+			converged = convergenceTime is not None
+		finalState = [[row[j] for j in destinations] for row in finalState]
+
+	result = {
+		"file"				: filename,
+		"algebra"			: algebra.name,
+		"nodes"				: size,
+		"source"			: data['source'],
+		"schedule"			: schedule,
+		"destinations"		: destinations,
+		"converged"			: converged,
+		"convergenceTime"	: convergenceTime,
+		"finalState"		: [[routeToJSON(route) for route in row] for row in finalState]
+	}
+	result.update(details)
+	return result
+
+def main(args):
+	parser = argparse.ArgumentParser(description="Solve PathVision routing problems (.pv files) without the GUI.")
+	parser.add_argument("files", nargs="+", help="routing problems to solve")
+	parser.add_argument("--limit", type=int, default=1000, help="maximum number of states computed per problem")
+	parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+	parser.add_argument("--schedule", choices=bellmanFord.SCHEDULES + [eventSimulator.ASYNCHRONOUS], default=bellmanFord.SYNCHRONOUS, help="order in which nodes update their routes")
+	parser.add_argument("--order", type=int, nargs="+", help="order in which the nodes are activated by the Gauss-Seidel and round-robin schedules; the same order is used for every file, so they must all have the same number of nodes")
+	parser.add_argument("--seed", type=int, help="seed for random link delays in the asynchronous schedule (all delays are equal otherwise)")
+	parser.add_argument("--destinations", type=int, nargs="+", help="destinations whose routes are computed (all by default); only these are simulated by the asynchronous schedule")
+	options = parser.parse_args(args)
+
+	# Problems that can't be read are reported along with the results
+	if options.order is not None:
+		sizes = set()
+		for filename in options.files:
+			try:
+				sizes.add(routingProblem.problemSize(routingProblem.loadProblem(filename)))
+			except Exception:
+				pass
+		if len(sizes) > 1:
+			parser.error("--order is used for every file, but the files have different numbers of nodes (" + ", ".join(map(str, sorted(sizes))) + ")")
+
+	# A problem that can't be solved is reported in place of its result,
+	# without stopping the others
+	failed = False
+	with ProcessPoolExecutor(options.workers) as executor:
+		futures = [executor.submit(solveProblem, filename, options.limit, options.schedule, options.order, options.seed, options.destinations) for filename in options.files]
+		for filename, future in zip(options.files, futures):
+			try:
+				result = future.result()
+			except Exception as e:
+				result = {"file" : filename, "error" : str(e)}
+				failed = True
+			print(json.dumps(result))
+	return 1 if failed else 0
+
+if __name__ == '__main__':
+	sys.exit(main(sys.argv[1:]))
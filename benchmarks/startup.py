@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+# Measures how long PathVision takes to show its first frame and to finish
+# loading the initial example. Run from the main directory with
+# `python3 benchmarks/startup.py`. Requires a display.
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Time to first frame that startup should stay within, in seconds
+FIRST_FRAME_TARGET = 1.0
+
+# How long to wait for the initial example to load before giving up, in seconds
+LOAD_TIMEOUT = 30.0
+
+# How often to process events while waiting for the example, in seconds
+LOAD_POLL_INTERVAL = 0.005
+
+def main():
+	start = time.perf_counter()
+
+	import PathVision
+	app = PathVision.App()
+	app.update_idletasks()
+	firstFrame = time.perf_counter() - start
+
+	# The example is read in the background, and has loaded once its graph
+	# has been handed to the simulation mode
+	graphController = app.simulationMode.graphController
+	while len(graphController.getGraph()) == 0 and time.perf_counter() - start < LOAD_TIMEOUT:
+		app.update()
+		time.sleep(LOAD_POLL_INTERVAL)
+	loaded = time.perf_counter() - start
+	hasLoaded = len(graphController.getGraph()) > 0
+
+	app.master.destroy()
+
+	print("Time to first frame:      {:.3f}s (target {:.3f}s)".format(firstFrame, FIRST_FRAME_TARGET))
+	if hasLoaded:
+		print("Time to example loaded:   {:.3f}s".format(loaded))
+	else:
+		print("The example hadn't loaded after {:.0f}s".format(LOAD_TIMEOUT))
+	return 0 if firstFrame <= FIRST_FRAME_TARGET and hasLoaded else 1
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -8,6 +8,8 @@ import networkx as nx
 
 import settings
 
+from theory.algebra import routeKey
+
 from modules.graphModule import GraphController
 from modules.graphSearchModule import GraphSearchController
 from modules.storageModule import StorageController
@@ -17,12 +19,16 @@ from modules.specialGraphModule import SpecialGraphController
 
 padding = 10
 
+# The number of route labels kept between redraws
+LABEL_CACHE_SIZE = 2**12
+
 class SimulationMode(tkinter.Frame):
 
 	def __init__(self, parent, app, *args, **kwargs):
 		tkinter.Frame.__init__(self, parent, *args, **kwargs)
 
 		self.app = app
+		self._labelCache = {}
 
 		# Left hand side
 		leftFrame = tkinter.Frame(self)
@@ -66,6 +72,7 @@ class SimulationMode(tkinter.Frame):
 
 	def problemTopologyChanged(self):
 		self.simulationController.endSimulation()
+		self._labelCache = {}
 		self.draw()
 	
 	def problemLabellingChanged(self):
@@ -83,26 +90,76 @@ class SimulationMode(tkinter.Frame):
 			withPaths = self.algebraController.getWithPaths()
 			abbreviatePaths = self.algebraController.getAbbreviatePaths()
 
-			labels = {}
-			for node in graph.nodes:
-				value = state[node]
-				if value is not None and withPaths and abbreviatePaths:
-					x, p = value
-					if len(p) > 3:
-						value = "({}, [{},{}, ..., {}])".format(x,p[0],p[1],p[2])
-				labels[node] = str(value)
+			labels = {node:self._constructLabel(state[node], withPaths, abbreviatePaths) for node in graph.nodes}
+
+			# Once the routes to the source have converged each node also
+			# shows when its route settled
+			settleTimes = self._getSettleTimes()
+			if settleTimes is not None:
+				labels = {node:labels[node] + "\n(since t=" + str(settleTimes[node]) + ")" for node in graph.nodes}
 		else:
+			self._labelCache.clear()
 			labels = {node:"" for node in graph.nodes}
 		
 		return labels
 	
+	# Routes are looked up by value, so the cache is only emptied when it
+	# fills up or the simulation ends
+	def _constructLabel(self, value, withPaths, abbreviatePaths):
+		key = (routeKey(value), withPaths and abbreviatePaths)
+		label = self._labelCache.get(key)
+		if label is None:
+			if len(self._labelCache) >= LABEL_CACHE_SIZE:
+				self._labelCache.clear()
+			if value is not None and withPaths and abbreviatePaths:
+				x, p = value
+				if len(p) > 3:
+					value = "({}, [{},{}, ..., {}])".format(x,p[0],p[1],p[2])
+			label = self._labelCache[key] = str(value)
+		return label
+
+	def _getSettleTimes(self):
+		if self.simulationController.isAtFixedPoint():
+			return None
+		source = self.graphController.getGraph().sourceNode
+		destinationTimes = self.simulationController.getDestinationConvergenceTimes()
+		if source is None or not destinationTimes or destinationTimes[source] is None:
+			return None
+		if self.simulationController.getCurrentTime() < destinationTimes[source]:
+			return None
+		return self.simulationController.getLastChangeTimes(source)
+
 	def _constructTitle(self):
 		if not self.simulationController.isSimulating():
 			return "Edit mode"
 
+		# The routes the simulation will converge to, before it has done so
+		if self.simulationController.isAtFixedPoint():
+			return "Simulation mode\nFixed point (found by Dijkstra's algorithm)"
+
 		convergenceTime = self.simulationController.getConvergenceTime()
 		time = self.simulationController.getCurrentTime()
-		return "Simulation mode\nTime = " + str(time) + (" (Converged)" if time == convergenceTime else "")
+
+		# Asynchronous simulations also show the time of the current state
+		# within the simulation
+		timeText = str(time)
+		clockTime = self.simulationController.getClockTime()
+		if clockTime is not None:
+			timeText += " (clock " + "{:.2f}".format(clockTime) + ")"
+		if time == convergenceTime:
+			return "Simulation mode\nTime = " + timeText + " (Converged)"
+
+		cycle = self.simulationController.getCycle()
+		if cycle is not None and time >= cycle[0]:
+			prePeriod, period = cycle
+			return "Simulation mode\nTime = " + timeText + " (Oscillating with period " + str(period) + " from time " + str(prePeriod) + ")"
+
+		# The routes shown are those to the source, which may settle earlier
+		destinationTimes = self.simulationController.getDestinationConvergenceTimes()
+		source = self.graphController.getGraph().sourceNode
+		if destinationTimes and source is not None and destinationTimes[source] is not None and time >= destinationTimes[source]:
+			return "Simulation mode\nTime = " + timeText + " (Routes to source converged)"
+		return "Simulation mode\nTime = " + timeText
 		
 	def draw(self):
 		labels = self._constructLabels()
@@ -2,7 +2,7 @@ import tkinter
 import settings
 
 from theory.algebra import DisplayAlgebra
-from theory.algebraExamples import examples
+from theory.algebraExamples import examples, findAlgebra
 
 ################
 ## Controller ##
@@ -34,13 +34,7 @@ class AlgebraController():
 	
 	def loadAlgebraData(self, algebraName, withPaths):
 		self.setWithPaths(withPaths)
-
-		for name, algebra in self._model.availableAlgebras.items():
-			if name == algebraName:
-				self.setAlgebra(algebra)
-				return
-
-		raise Exception("Tried to load algebra " + name + " but no corresponding algebra found")
+		self.setAlgebra(findAlgebra(algebraName))
 
 	def saveAlgebraData(self):
 		return {
@@ -1,9 +1,26 @@
+import os
+import random
 import threading
+import time
 import tkinter
+import tkinter.ttk
+from concurrent.futures import ProcessPoolExecutor
 
 import settings
 import theory.bellmanFord as bellmanFord
+import theory.numericBellmanFord as numericBellmanFord
 import theory.algebraExamples as algebraExamples
+import theory.randomSearch as randomSearch
+import theory.localSearch as localSearch
+from theory.minimise import ddmin
+from theory.scoreCache import ScoreCache
+
+RANDOM_SAMPLING = "Random sampling"
+STRATEGIES = [RANDOM_SAMPLING] + list(localSearch.strategies.keys())
+
+# Scores of previously solved problems are kept between searches and sessions
+SCORE_CACHE_SIZE = 100000
+SCORE_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".pathvision", "scoreCache.pickle")
 
 ################
 ## Controller ##
@@ -17,11 +34,11 @@ class GraphSearchController():
 		self._mode  = mode
 
 	def startSearch(self):
-		runs, size = self._view.getSearchParameters()
+		runs, size, strategy = self._view.getSearchParameters()
 		algebra = self._mode.algebraController.getComputationAlgebra()
 
 		self._view.enterSearchState()
-		self._model.startSearch(algebra, runs, size)
+		self._model.startSearch(algebra, runs, size, strategy)
 
 	def endSearch(self):
 		self._model.endSearch()
@@ -30,6 +47,18 @@ class GraphSearchController():
 	def updateProgress(self, progress, currentScore):
 		self._view.updateProgress(progress, currentScore)
 
+	def updateInstance(self, seed, trial):
+		self._view.updateInstance(seed, trial)
+
+	def updateLocalSearchInstance(self, strategy, seed, runs):
+		self._view.updateLocalSearchInstance(strategy, seed, runs)
+
+	def updateCacheStatistics(self, hits, lookups, hitRate):
+		self._view.updateCacheStatistics(hits, lookups, hitRate)
+
+	def updateMinimisation(self, solves, seconds):
+		self._view.updateMinimisation(solves, seconds)
+
 	def updateResult(self, adjacencyMatrix, sourceNode):
 		self._mode.graphController.loadGraphFromAdjacencyMatrix(adjacencyMatrix)
 		self._mode.graphController.setSourceNode(sourceNode)
@@ -42,82 +71,184 @@ class GraphSearchController():
 class GraphSearchModel():
 	def __init__(self, controller):
 		self.controller = controller
+		self.cache = None
+		self.solves = 0
+		self._executor = None
 
 	############
 	## Interface
 
-	def startSearch(self, algebra, totalRuns, graphSize):
+	def startSearch(self, algebra, totalRuns, graphSize, strategy=RANDOM_SAMPLING, seed=None):
 		# Core search parameters
 		self.totalRuns		= totalRuns
 		self.graphSize 		= graphSize
 		self.algebra 		= algebra
+		self.strategy 		= strategy
+		self.workers 		= os.cpu_count() or 1
+
+		# Each chunk of trials has its own seed, all derived from the search seed
+		self.seed 		= random.getrandbits(32) if seed is None else seed
+		self.chunks 	= randomSearch.createChunks(algebra, totalRuns, self.seed, self.workers)
 
 		# Derived search parameters
 		self.idM 		= bellmanFord.createIdentityMatrix(algebra, graphSize)
+		self.engine		= numericBellmanFord if numericBellmanFord.isApplicable(algebra) else bellmanFord
+
+		if self.cache is None:
+			self.cache = ScoreCache(SCORE_CACHE_SIZE, SCORE_CACHE_FILE, randomSearch.SEARCH_LIMIT)
+		self.cache.resetStatistics()
 		
 		# Start the search
-		threading.Thread(target=self._runSearch).start()
 		self.searching = True
+		if strategy == RANDOM_SAMPLING:
+			threading.Thread(target=self._runSearch).start()
+		else:
+			threading.Thread(target=self._runLocalSearch).start()
 
 	def endSearch(self):
 		self.searching = False
 
+	# Regenerates the instance produced by the given trial of a chunk
+	def generateInstance(self, seed, trial):
+		return randomSearch.generateInstance(self.algebra, self.graphSize, seed, trial)
+
 	#####################
 	## Internal functions
 
-	def _createRandomAdjacencyMatrix(self, size):
-		return [[self.algebra.randomEdge() if i != j else self.algebra.invalidEdge 
-					for i in range(size)] 
-						for j in range(size)]
-		
 	def _runSearch(self):
-		
-		updateFrequency = int(self.totalRuns/100)
+		bestScore 	= 0
+		runs 		= 0
 
-		bestScore 		= 0
-		bestInstance 	= None
+		results = randomSearch.search(self.algebra, self.graphSize, self.chunks, self.workers)
+		for seed, trial, score, trials in results:
+			runs += trials
 
-		for i in range(self.totalRuns):
-			adM = self._createRandomAdjacencyMatrix(self.graphSize)
-			score = self._calculateScore(adM)
-			
 			if score > bestScore:
-				bestScore    = score
-				bestInstance = adM
-				self._newBestFound(adM)
+				bestScore = score
+				self.controller.updateInstance(seed, trial)
+				self._newBestFound(self.generateInstance(seed, trial))
 
-			if i % updateFrequency == 0:
-				self.controller.updateProgress(i/self.totalRuns, bestScore)
+			self._updateProgress(runs/self.totalRuns, bestScore)
 
 			if not self.searching:
 				break
-		
-		self.controller.updateProgress(1.0, bestScore)
+		results.close()
+
+		self._finishSearch(bestScore)
+
+	# Local searches run in this process from a generator seeded with the
+	# search seed, so an instance is identified by the number of solves made
+	# before it was found (see localSearch.regenerateInstance)
+	def _runLocalSearch(self):
+		rng = random.Random(self.seed)
+
+		updateFrequency = max(1, self.totalRuns // 100)
+		bestScore 		= 0
+		lastUpdate 		= 0
+
+		strategy = localSearch.strategies[self.strategy]
+		for runs, score, adM in strategy(self.algebra, self.graphSize, self.totalRuns, self._calculateScores, rng):
+			if adM is not None and score > bestScore:
+				bestScore = score
+				self.controller.updateLocalSearchInstance(self.strategy, self.seed, runs)
+				self._newBestFound([row[:] for row in adM])
+
+			if runs - lastUpdate >= updateFrequency:
+				lastUpdate = runs
+				self._updateProgress(runs/self.totalRuns, bestScore)
+
+			if not self.searching:
+				break
+
+		self._finishSearch(bestScore)
+
+	def _updateProgress(self, progress, bestScore):
+		self.controller.updateProgress(progress, bestScore)
+		self.controller.updateCacheStatistics(self.cache.hits, self.cache.lookups, self.cache.hitRate())
+
+	def _finishSearch(self, bestScore):
+		self._updateProgress(1.0, bestScore)
+		self.cache.save()
+		if self._executor is not None:
+			self._executor.shutdown()
+			self._executor = None
 		self.controller.endSearch()
 
 	# Calculates how long a given adjacency matrix adM takes to converge
 	def _calculateScore(self, adM):
-		routingComputation = bellmanFord.solve(self.algebra, self.idM, self.idM, adM)
-		return len(routingComputation) - 2
-
-	# Simplifies the search result by testing if we can remove each edge one by one
+		return self._calculateProfile(adM)[0]
+
+	# Calculates how long adM takes to converge along with the time at which
+	# each destination converged, from a single solve
+	def _calculateProfile(self, adM):
+		key, order = self.cache.key(self.algebra, adM)
+		entry = self.cache.get(key, order)
+		if entry is not None and entry[1] is not None:
+			return entry
+
+		cycle, destinationTimes = self.engine.probeCycle(self.algebra, self.idM, self.idM, adM, randomSearch.SEARCH_LIMIT)
+		score = randomSearch.cycleScore(cycle)
+		self.solves += 1
+		self.cache.put(key, order, score, destinationTimes)
+		return score, destinationTimes
+
+	# As _calculateScore for a list of adjacency matrices, solving the ones
+	# that aren't cached together (in parallel if an executor is given)
+	def _calculateScores(self, adMs, executor=None):
+		keys = [self.cache.key(self.algebra, adM) for adM in adMs]
+		entries = [self.cache.get(key, order) for key, order in keys]
+		scores = [None if entry is None else entry[0] for entry in entries]
+
+		missing = [i for i, score in enumerate(scores) if score is None]
+		newScores = randomSearch.calculateScores(self.algebra, self.idM, [adMs[i] for i in missing], executor)
+		self.solves += len(missing)
+		for i, score in zip(missing, newScores):
+			scores[i] = score
+			self.cache.put(*keys[i], score)
+		return scores
+
+	# Simplifies the search result without reducing its convergence time by
+	# removing as many edges as possible, and for F-custom then replacing as
+	# many of the remaining weights as possible with "c". Uses delta debugging
+	# so that groups of edges are tried at once, with the candidates of each
+	# round solved in parallel.
 	def _optimiseSearchResult(self, adM):
-		score = self._calculateScore(adM)
+		startTime = time.time()
+		startSolves = self.solves
 
-		for i in range(len(adM)):
-			for j in range(len(adM)):
-				entry = adM[i][j]
-				adM[i][j] = self.algebra.invalidEdge
-
-				newScore = self._calculateScore(adM)
-				if newScore < score:
-					if self.algebra == algebraExamples.fRing and adM[i][j] != "c":
-						adM[i][j] = "c"
-						newScore = self._calculateScore(adM)
-						if newScore < score:
-							adM[i][j] = entry
-					else:
-						adM[i][j] = entry
+		score = self._calculateScore(adM)
+		self._minimiseEdges(adM, score, self.algebra.invalidEdge)
+		if self.algebra == algebraExamples.fRing:
+			self._minimiseEdges(adM, score, algebraExamples.compileEdgeFunction("c"))
+
+		self.controller.updateMinimisation(self.solves - startSolves, time.time() - startTime)
+
+	# Replaces the weights of as many edges as possible by the given weight
+	# while keeping the score, keeping only a minimal set of the original
+	# weights
+	def _minimiseEdges(self, adM, score, replacement):
+		edges = [(i, j) for i in range(len(adM)) for j in range(len(adM))
+					if adM[i][j] != replacement and adM[i][j] != self.algebra.invalidEdge]
+
+		def apply(kept):
+			removed = set(edges).difference(kept)
+			return [[replacement if (i, j) in removed else w for j, w in enumerate(row)]
+						for i, row in enumerate(adM)]
+
+		def test(candidates):
+			scores = self._calculateScores([apply(kept) for kept in candidates], self._getExecutor())
+			return [newScore >= score for newScore in scores]
+
+		result = apply(ddmin(edges, test))
+		for i, row in enumerate(result):
+			adM[i][:] = row
+
+	# Non-numeric candidates are solved in a pool of processes kept for the
+	# rest of the search
+	def _getExecutor(self):
+		if self._executor is None and self.workers > 1 and not numericBellmanFord.isApplicable(self.algebra):
+			self._executor = ProcessPoolExecutor(self.workers)
+		return self._executor
 
 	# Replaces all invalid edges with no edges at all
 	def _cleanSearchResult(self, adM):
@@ -126,16 +257,15 @@ class GraphSearchModel():
 				if adM[i][j] == self.algebra.invalidEdge:
 					adM[i][j] = None
 
-	# Calculates the source node for which the computation takes the longest to converge
+	# Calculates the source node for which the computation takes the longest
+	# to converge, using the destination times recorded when adM was scored
 	def _calculateBestSourceNode(self,adM):
-		states = bellmanFord.solve(self.algebra, self.idM, self.idM, adM)
+		_, destinationTimes = self._calculateProfile(adM)
 
-		sourceNode = -1
-		for i in range(len(adM)):
-			if [row[i] for row in states[-2]] != [row[i] for row in states[-3]]:
-				sourceNode = i
-				break
-		return sourceNode
+		def convergenceTime(j):
+			return float('inf') if destinationTimes[j] is None else destinationTimes[j]
+
+		return max(range(len(adM)), key=convergenceTime, default=-1)
 	
 	def _newBestFound(self, adM):
 		self._optimiseSearchResult(adM)
@@ -165,9 +295,23 @@ class GraphSearchView(tkinter.Frame):
 		self.sizeE = tkinter.Entry(self, width=10)
 		self.sizeE.insert(0, 5)
 
+		self.strategyV = tkinter.StringVar()
+		self.strategyL = tkinter.Label(self, text="Strategy:")
+		self.strategyCB = tkinter.ttk.Combobox(self,textvariable=self.strategyV,values=STRATEGIES,state="readonly",width=10)
+		self.strategyCB.current(0)
+
 		self.progressL = tkinter.Label(self, text="Results:")
 		self.progressDL = tkinter.Label(self, justify=tkinter.LEFT)
 
+		self.instanceL = tkinter.Label(self, text="Instance:")
+		self.instanceDL = tkinter.Label(self, justify=tkinter.LEFT)
+
+		self.cacheL = tkinter.Label(self, text="Cache hits:")
+		self.cacheDL = tkinter.Label(self, justify=tkinter.LEFT)
+
+		self.minimisationL = tkinter.Label(self, text="Minimised:")
+		self.minimisationDL = tkinter.Label(self, justify=tkinter.LEFT)
+
 		self.searchB = tkinter.Button(self, width=15)
 
 		self.headerL.grid(		row=0,column=0,sticky="W",columnspan=2)
@@ -175,9 +319,17 @@ class GraphSearchView(tkinter.Frame):
 		self.iterationsE.grid(	row=1,column=1,sticky="W",pady=(5,2.5),  padx=(10,0))
 		self.sizeL.grid(		row=2,column=0,sticky="W",pady=(2.5,2.5))
 		self.sizeE.grid(		row=2,column=1,sticky="W",pady=(2.5,2.5),padx=(10,0))
-		self.progressL.grid(	row=3,column=0,sticky="W",pady=(2.5,2.5))
-		self.progressDL.grid(	row=3,column=1,sticky="W",pady=(2.5,2.5),padx=(10,0))
-		self.searchB.grid(		row=4,column=0,sticky="", pady=(2.5,5),columnspan=2)
+		self.strategyL.grid(	row=3,column=0,sticky="W",pady=(2.5,2.5))
+		self.strategyCB.grid(	row=3,column=1,sticky="W",pady=(2.5,2.5),padx=(10,0))
+		self.progressL.grid(	row=4,column=0,sticky="W",pady=(2.5,2.5))
+		self.progressDL.grid(	row=4,column=1,sticky="W",pady=(2.5,2.5),padx=(10,0))
+		self.instanceL.grid(	row=5,column=0,sticky="W",pady=(2.5,2.5))
+		self.instanceDL.grid(	row=5,column=1,sticky="W",pady=(2.5,2.5),padx=(10,0))
+		self.cacheL.grid(		row=6,column=0,sticky="W",pady=(2.5,2.5))
+		self.cacheDL.grid(		row=6,column=1,sticky="W",pady=(2.5,2.5),padx=(10,0))
+		self.minimisationL.grid(row=7,column=0,sticky="W",pady=(2.5,2.5))
+		self.minimisationDL.grid(row=7,column=1,sticky="W",pady=(2.5,2.5),padx=(10,0))
+		self.searchB.grid(		row=8,column=0,sticky="", pady=(2.5,5),columnspan=2)
 		self.columnconfigure(1,weight=1)
 
 		self.enterStandbyState()
@@ -188,7 +340,8 @@ class GraphSearchView(tkinter.Frame):
 	def getSearchParameters(self):
 		runs = int(self.iterationsE.get())
 		size = int(self.sizeE.get())
-		return runs, size
+		strategy = self.strategyV.get()
+		return runs, size, strategy
 
 	############
 	## Actions
@@ -196,13 +349,36 @@ class GraphSearchView(tkinter.Frame):
 	def enterStandbyState(self):
 		self.iterationsE.configure(state=tkinter.NORMAL)
 		self.sizeE.configure(state=tkinter.NORMAL)
+		self.strategyCB.configure(state="readonly")
 		self.searchB.configure(text="Start searching", command=self.controller.startSearch)
 
 	def enterSearchState(self):
 		self.iterationsE.configure(state=tkinter.DISABLED)
 		self.sizeE.configure(state=tkinter.DISABLED)
+		self.strategyCB.configure(state=tkinter.DISABLED)
 		self.searchB.configure(text="Stop searching", command=self.controller.endSearch)
 
 	def updateProgress(self, progress, bestScore):
-		text = "{} rounds ({}%)".format(bestScore, int(100*progress))
-		self.progressDL.configure(text=text)
\ No newline at end of file
+		if bestScore == randomSearch.OSCILLATING_SCORE:
+			text = "oscillates ({}%)".format(int(100*progress))
+		elif bestScore == randomSearch.NOT_CONVERGED_SCORE:
+			text = "did not converge ({}%)".format(int(100*progress))
+		else:
+			text = "{} rounds ({}%)".format(bestScore, int(100*progress))
+		self.progressDL.configure(text=text)
+
+	def updateInstance(self, seed, trial):
+		text = "seed {}, trial {}".format(seed, trial)
+		self.instanceDL.configure(text=text)
+
+	def updateLocalSearchInstance(self, strategy, seed, runs):
+		text = "{} from seed {}, after {} solves".format(strategy.lower(), seed, runs)
+		self.instanceDL.configure(text=text)
+
+	def updateCacheStatistics(self, hits, lookups, hitRate):
+		text = "{} of {} ({}%)".format(hits, lookups, int(100*hitRate))
+		self.cacheDL.configure(text=text)
+
+	def updateMinimisation(self, solves, seconds):
+		text = "{} solves in {:.2f}s".format(solves, seconds)
+		self.minimisationDL.configure(text=text)
\ No newline at end of file
@@ -61,7 +61,7 @@ class OrderSearchController():
 			identityRoute       = identityRoute,
 			invalidEdge         = invalidEdge,
 			defaultEdge			= 1,
-			randomEdge			= lambda:defaultEdge,
+			randomEdge			= lambda rng=None:defaultEdge,
 			validateEdgeString	= lambda x : x == "1",
 			parseEdgeString		= int,
 			componentAlgebras	= []
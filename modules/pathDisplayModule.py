@@ -2,8 +2,6 @@ import tkinter
 from itertools import groupby
 from collections import defaultdict
 
-import matplotlib.pyplot as plt
-from matplotlib.colors import to_hex
 import networkx as nx
 
 import settings
@@ -45,6 +43,10 @@ class PathDisplayController():
 		self.draw()
 
 	def draw(self):
+		# Matplotlib is only loaded once the exploration mode draws
+		import matplotlib.pyplot as plt
+		from matplotlib.colors import to_hex
+
 		nodes = self._model.disputeGraph.nodes()
 		edges = self._model.disputeGraph.edges()
 		orderEdges = self._model.additionalEdges
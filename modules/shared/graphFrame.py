@@ -3,10 +3,6 @@ from collections import defaultdict
 
 import tkinter
 import networkx as nx
-import matplotlib
-matplotlib.use('TkAgg')
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
 
 from settings import NODE_SIZE, NODE_COLOUR, SOURCE_NODE_COLOUR, NODE_LABEL_OFFSET
 from modules.shared.graphInteraction import Interaction
@@ -19,8 +15,8 @@ class GraphFrame(tkinter.Frame):
 			
 		self.controller = controller
 
-		self._setupCanvas()
-		self._setupMouseInteractions()
+		# The canvas is only created when the first graph is drawn
+		self.canvas = None
 
 		self.dragTarget = None
 		self.dragged = False
@@ -32,6 +28,13 @@ class GraphFrame(tkinter.Frame):
 		self.nodePositions = {}
 
 	def _setupCanvas(self):
+		# Matplotlib and its Tk backend are only loaded once the first graph
+		# is drawn, so that the window can appear without them
+		import matplotlib
+		matplotlib.use('TkAgg')
+		from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+		import matplotlib.pyplot as plt
+
 		self.figure = plt.figure(facecolor="white")
 		plt.subplots_adjust(top=1, bottom=0, right=1, left=0, hspace=0, wspace=0)
 		plt.axis('off')
@@ -69,6 +72,10 @@ class GraphFrame(tkinter.Frame):
 			self.behaviours.remove(behaviour)
 
 	def draw(self, drawData):
+		if self.canvas is None:
+			self._setupCanvas()
+			self._setupMouseInteractions()
+
 		# Apply the behaviours to the drawData
 		for behaviour in self.behaviours:
 			behaviour.processDrawData(drawData)
@@ -104,7 +111,7 @@ class GraphFrame(tkinter.Frame):
 
 		# Configure canvas
 		self.axes.cla()
-		plt.axis('off')
+		self.axes.axis('off')
 		height = self.canvas.get_tk_widget().winfo_height()
 		width = self.canvas.get_tk_widget().winfo_width()
 		self.axes.set_xlim(-width/200, width/200)
@@ -1,6 +1,33 @@
+import collections
+import threading
 import tkinter
+import tkinter.filedialog
+import tkinter.ttk
 
 import theory.bellmanFord as bellmanFord
+import theory.cycles as cycles
+import theory.traceFormat as traceFormat
+import theory.numericBellmanFord as numericBellmanFord
+import theory.dijkstra as dijkstra
+from theory.eventSimulator import ASYNCHRONOUS, EventSimulator
+from theory.algebra import Algebra
+from theory.history import CheckpointedHistory
+
+# How often the view checks for newly computed states (ms)
+POLL_INTERVAL = 50
+
+# How many states the background worker computes beyond the current one
+# before waiting for the current time to move on
+LOOKAHEAD = 1000
+
+# The fraction of possible edges a graph needs before its synchronous
+# simulation is vectorised, as each vectorised step costs O(n^3) whereas the
+# incremental one only follows the edges into changed routes
+NUMERIC_DENSITY = 0.02
+
+# The number of routes kept in memory for a simulation's history. Beyond
+# this, earlier states are recomputed from keyframes when revisited.
+HISTORY_BUDGET = 2**20
 
 ################
 ## Controller ##
@@ -12,6 +39,7 @@ class SimulationController():
 		self._model = SimulationModel()
 		self._view  = SimulationView(self, parent)
 		self._mode  = mode
+		self._pollID = None
 
 		self._model.enterInactiveState()
 		self._view.enterInactiveState()
@@ -20,6 +48,7 @@ class SimulationController():
 	## Commands
 
 	def endSimulation(self):
+		self._cancelPolling()
 		self._view.enterInactiveState()
 		self._model.enterInactiveState()
 
@@ -30,8 +59,40 @@ class SimulationController():
 		withPaths = self._mode.algebraController.getWithPaths()
 		graph     = self._mode.graphController.getGraph()
 
-		self._model.enterSimulationState(algebra, withPaths, graph)
+		try:
+			schedule, order = self._view.getSchedule()
+			seed = self._view.getDelaySeed()
+		except Exception as e:
+			self._view.showError(str(e))
+			return
+
+		traceFilename = None
+		if self._view.getRecordTrace():
+			traceFilename = tkinter.filedialog.asksaveasfilename()
+			if not traceFilename:
+				return
+
+		self._cancelPolling()
+		try:
+			self._model.enterSimulationState(algebra, withPaths, graph, traceFilename, schedule, order, seed)
+		except Exception as e:
+			self._view.showError(str(e))
+			return
+		self._view.showError(None)
 		self._simulationTimeChanged()
+
+	def replaySimulation(self):
+		filename = tkinter.filedialog.askopenfilename()
+		if filename:
+			graph = self._mode.graphController.getGraph()
+			self._cancelPolling()
+			try:
+				self._model.enterReplayState(graph, filename, self._mode.algebraController.getComputationAlgebra())
+			except Exception as e:
+				self._view.showError(str(e))
+				return
+			self._view.showError(None)
+			self._simulationTimeChanged()
 		
 	def moveToStart(self):
 		self._model.moveToStart()
@@ -49,6 +110,12 @@ class SimulationController():
 		self._model.moveToEnd()
 		self._simulationTimeChanged()
 
+	def moveToTime(self, time):
+		time = int(time)
+		if self._model.isSimulating and time != self._model.currentTime:
+			self._model.moveToTime(time)
+			self._simulationTimeChanged()
+
 	############
 	## Getters
 
@@ -67,17 +134,58 @@ class SimulationController():
 	def getConvergenceTime(self):
 		return self._model.getConvergenceTime()
 
+	def getCycle(self):
+		return self._model.getCycle()
+
+	def getClockTime(self):
+		return self._model.getClockTime()
+
+	def isAtFixedPoint(self):
+		return self._model.isAtFixedPoint()
+
+	def getLastChangeTimes(self, destination):
+		return self._model.getLastChangeTimes(destination)
+
+	def getDestinationConvergenceTimes(self):
+		return self._model.getDestinationConvergenceTimes()
+
 	#############
 	## Internal
 
+	# Moving on may let the worker compute further, so polling resumes
 	def _simulationTimeChanged(self):
+		self._updateButtons()
+		self._mode.draw()
+		self._view.after_idle(self._model.prefetch)
+		if self._pollID is None and self._model.isComputing():
+			self._pollSimulation()
+
+	def _updateButtons(self):
 		self._view.enterSimulationState(
 			self._model.canMoveToStart(),
 			self._model.canMoveBack(),
 			self._model.canMoveForward(),
 			self._model.canMoveToEnd()
 		)
-		self._mode.draw()
+		self._view.setTimeline(self._model.currentTime, self._model.getLastTime())
+
+	# Keeps the buttons up to date while states are computed in the
+	# background, redrawing once the worker has finished or is waiting
+	def _pollSimulation(self):
+		if self._model.isComputing():
+			self._updateButtons()
+			self._pollID = self._view.after(POLL_INTERVAL, self._pollSimulation)
+		else:
+			self._pollID = None
+			error = self._model.getError()
+			if error is not None:
+				self._view.showError(error)
+			self._simulationTimeChanged()
+
+	def _cancelPolling(self):
+		if self._pollID is not None:
+			self._view.after_cancel(self._pollID)
+			self._pollID = None
 
 
 ###########
@@ -87,82 +195,436 @@ class SimulationController():
 class SimulationModel():
 	
 	def __init__(self):
-		pass
+		self.trace = None
+		self._worker = None
+		self._stopEvent = threading.Event()
+		self._wakeEvent = threading.Event()
+		self._idle = False
+		self._lock = threading.RLock()
 
 
 	############
 	## Actions
 
+	# The worker is only told to stop, and finishes its current step in the
+	# background without adding to the computation
 	def enterInactiveState(self):
-		self.isSimulating = False
-		self.computation = None
-		self.currentTime = None
-
-	def enterSimulationState(self, algebra, withPaths, graph):
+		self._stopWorker()
+		with self._lock:
+			if self.trace is not None:
+				self.trace.close()
+
+			self.isSimulating = False
+			self.isReplaying = False
+			# Dropping the algebra, and everything using it, also drops its
+			# table of hash-consed routes
+			self.algebra = None
+			self._step = None
+			self._simulator = None
+			self.computation = None
+			self.currentTime = None
+			self.trace = None
+			self.error = None
+			self.atFixedPoint = False
+			self._fixedPoint = None
+			self._increasing = False
+
+	# The states are computed lazily on a background worker, up to LOOKAHEAD
+	# states ahead of the current one, and only the initial state is
+	# available immediately. If a trace filename is given
+	# the states are streamed to that file rather than kept in memory. Each
+	# step of the simulation is a step of the given schedule (see
+	# bellmanFord.createScheduleStep). Under the asynchronous schedule the
+	# states are instead those between which the event simulator changed a
+	# route, with link delays taken from the edges' delay attributes or drawn
+	# at random from the seed, and only the routes to the given destinations
+	# (all by default) are simulated.
+	def enterSimulationState(self, algebra, withPaths, graph, traceFilename=None, schedule=bellmanFord.SYNCHRONOUS, order=None, seed=None, destinations=None):
+		# Everything that can fail is done before the model changes, so that
+		# it is left as it was
+		if schedule not in bellmanFord.SCHEDULES + [ASYNCHRONOUS]:
+			raise Exception("Unknown schedule " + str(schedule))
+		bellmanFord.createNodeOrder(len(graph), order)
+		for j in destinations or []:
+			if j not in graph:
+				raise Exception("Destination " + str(j) + " is not a node of the graph")
+		isNumeric = schedule == bellmanFord.SYNCHRONOUS and numericBellmanFord.isApplicable(algebra) and graph.number_of_edges() >= NUMERIC_DENSITY * len(graph)**2
+		sweep = bellmanFord.sweepLength(schedule, len(graph))
+		trace = traceFormat.RecordedTrace(traceFilename, len(graph), isNumeric, algebra.name, schedule, sweep) if traceFilename else None
+
+		self._joinWorker()
 		self.isSimulating = True
-		self.algebra = algebra
+		self.isReplaying = False
+		self.isNumeric = isNumeric
+		self.algebra = algebra if self.isNumeric else Algebra.hashConsed(algebra)
 		self.identityMatrix = bellmanFord.createIdentityMatrix(algebra, len(graph))
-		self.adjacencyMatrix = bellmanFord.createAdjacencyMatrix(algebra, graph)
+		self.neighbours = bellmanFord.createNeighbourLists(algebra, graph)
+		self._simulator = None
+		if self.isNumeric:
+			self.adjacencyMatrix = bellmanFord.createAdjacencyMatrix(algebra, graph)
+		elif schedule == ASYNCHRONOUS:
+			delays = {(i, k) : data['delay'] for i, k, data in graph.edges(data=True) if 'delay' in data}
+			self._simulator = EventSimulator(self.algebra, self.neighbours, delays, seed, destinations)
+			self._eventLog = []
+			self._eventTimes = [0.0]
+			self._step = self._applyEvents
+		else:
+			self._step = bellmanFord.createScheduleStep(self.algebra, self.identityMatrix, self.neighbours, schedule, order)
 		self.graph = graph
+		self.error = None
+		self.atFixedPoint = False
+		self._fixedPoint = None
+		self._increasing = dijkstra.isApplicable(algebra, self.neighbours)
+
+		if trace is not None:
+			self.trace = trace
+			self.computation = trace
+		else:
+			budget = HISTORY_BUDGET // max(len(graph), 1)**2
+			self.computation = CheckpointedHistory(self._iterate, budget)
+		self.computation.append(self.identityMatrix)
+		self.currentTime = 0
 
-		state1 = self.identityMatrix
-		state2 = bellmanFord.iterate(self.algebra, state1, self.identityMatrix, self.adjacencyMatrix)
-
-		self.computation = [state1, state2]	
+		# The entries changed over the last sweep, in which every node was
+		# activated. The computation has converged once they are empty.
+		self.sweep = sweep
+		self.changes = None
+		self._recentChanges = collections.deque(maxlen=self.sweep)
+
+		# The background simulation stops as soon as a state recurs. Under
+		# round-robin the next node to activate is part of the state, and
+		# asynchronously the messages in flight are, so no cycles are sought.
+		self.cycle = None
+		self._cycleDetector = None
+		if self._simulator is None:
+			self._cycleDetector = cycles.CycleDetector(lambda x : hash((x[0], cycles.stateFingerprint(x[1]))))
+			self._cycleDetector.add((0, self.identityMatrix))
+
+		# The last time at which each node's route to each destination changed
+		self.lastChanges = [[0 for _ in range(len(graph))] for _ in range(len(graph))]
+
+		self._stopEvent.clear()
+		self._wakeEvent.clear()
+		self._idle = False
+		# A step of the asynchronous simulation may change a single route
+		steps = len(graph)**2 * (len(graph) if self._simulator else self.sweep) + 1
+		self._worker = threading.Thread(target=self._simulateInBackground, args=(steps,), daemon=True)
+		self._worker.start()
+
+	# Steps through a previously recorded trace of the graph, which must have
+	# been computed with the given algebra if the trace records one
+	def enterReplayState(self, graph, traceFilename, algebra=None):
+		trace = traceFormat.TraceReader(traceFilename)
+		if trace.size != len(graph):
+			trace.close()
+			raise Exception("The trace is for a graph with " + str(trace.size) + " nodes but the current graph has " + str(len(graph)))
+		if algebra is not None and trace.algebra is not None and trace.algebra != algebra.name:
+			trace.close()
+			raise Exception("The trace was computed with " + trace.algebra + " but the current algebra is " + algebra.name)
+
+		self._joinWorker()
+		self.enterInactiveState()
+		self.isSimulating = True
+		self.isReplaying = True
+		self.graph = graph
+		self.trace = trace
+		self.computation = trace
 		self.currentTime = 0
+		self.lastChanges = None
+		self.cycle = None
+		self.sweep = trace.sweep
+		self._simulator = None
+		self.error = None
+		self.atFixedPoint = False
+		self._fixedPoint = None
+		self._increasing = False
+		# The simulation converged if the trace ends with a sweep that
+		# changed nothing
+		converged = len(trace) > trace.sweep and all(trace[-1] == trace[-1 - d] for d in range(1, trace.sweep + 1))
+		self.changes = set() if converged else None
 
-		self.simulate(len(graph)**2)
-	
 	def simulate(self, steps):
+		if self.isReplaying:
+			return
+
 		i = 0
-		while not self.hasConverged() and i < steps:
+		while not self.hasConverged() and i < steps and not self._stopEvent.is_set():
 			currentState = self.computation[-1]
-			newState = bellmanFord.iterate(self.algebra, currentState, self.identityMatrix, self.adjacencyMatrix)
-			self.computation.append(newState)
+			newState, changes = self._iterate(currentState, self._recentChanges[-1] if self._recentChanges else None, len(self.computation) - 1)
+
+			with self._lock:
+				if self._stopEvent.is_set():
+					break
+				self.computation.append(newState)
+				self._recentChanges.append(changes)
+				self.changes = set().union(*self._recentChanges)
+				for node, destination in changes:
+					self.lastChanges[node][destination] = len(self.computation) - 1
 			i += 1
 
+			phase = (len(self.computation) - 1) % self.sweep
+			if self.changes and self._cycleDetector is not None and self.cycle is None and self._cycleDetector.add((phase, newState)):
+				self._foundCycle(self._cycleDetector.period)
+				break
+
 	def moveToStart(self):
+		self.atFixedPoint = False
 		self.currentTime = 0
 
 	def moveBack(self):
+		if self.atFixedPoint:
+			self.atFixedPoint = False
+			return
 		self.currentTime -= 1
 
 	def moveForwards(self):
-		if self.currentTime > len(self.computation) - 2:
+		self.atFixedPoint = False
+		if self.currentTime >= self._lastTime() and not self.isComputing():
 			self.simulate(1)
-		self.currentTime += 1
+		if self.currentTime < self._lastTime():
+			self.currentTime += 1
+		self._wakeWorker()
 
+	# Before the simulation has converged the routes to the source that it
+	# will converge to may still be known, and are then shown instead
 	def moveToEnd(self):
-		self.currentTime = len(self.computation)-2
+		if self.hasConverged() or self.isReplaying or self.cycle is not None:
+			self.atFixedPoint = False
+			self.currentTime = self._lastTime()
+			self._wakeWorker()
+		elif self._getFixedPoint() is not None:
+			self.atFixedPoint = True
+
+	def moveToTime(self, time):
+		self.atFixedPoint = False
+		self.currentTime = max(0, min(time, self._lastTime()))
+		self._wakeWorker()
+
+	# Makes the states either side of the current one ready in advance
+	def prefetch(self):
+		if self.isSimulating and not self.isReplaying and self.trace is None:
+			with self._lock:
+				self.computation.prefetch(self.currentTime)
 
 	############
 	## Getters
 
+	# Whether the worker is computing states, rather than waiting for the
+	# current time to move on or finished
+	def isComputing(self):
+		with self._lock:
+			return self._worker is not None and self._worker.is_alive() and not self._idle and not self._stopEvent.is_set()
+
 	def hasConverged(self):
-		return len(self.computation) >= 2 and self.computation[-1] == self.computation[-2]
+		with self._lock:
+			return len(self.computation) > self.sweep and not self.changes
 
 	def canMoveToStart(self):
 		return self.currentTime > 0
 
 	def canMoveBack(self):
-		return self.currentTime > 0
+		return self.atFixedPoint or self.currentTime > 0
 
 	def canMoveForward(self):
-		return (not self.hasConverged()) or (self.currentTime < len(self.computation) - 2)
+		if self.atFixedPoint:
+			return False
+		if self.currentTime < self._lastTime():
+			return True
+		return not self.hasConverged() and not self.isReplaying and not self.isComputing()
 
 	def canMoveToEnd(self):
-		return self.hasConverged() and self.currentTime < len(self.computation) - 2
+		if self.hasConverged() or self.isReplaying or self.cycle is not None:
+			return self.atFixedPoint or self.currentTime < self._lastTime()
+		return not self.atFixedPoint and self._hasFixedPoint()
 
 	def getCurrentState(self):
-		state = self.computation[self.currentTime]
 		source = self.graph.sourceNode
+		if self.atFixedPoint:
+			routes = self._getFixedPoint()
+			return {n:routes[n] for n in range(len(self.graph))}
+		with self._lock:
+			state = self.computation[self.currentTime]
 		return {n:state[n][source] for n in range(len(self.graph))}
 
+	# Whether the routes shown are the fixed point found by Dijkstra's
+	# algorithm rather than a state of the simulation
+	def isAtFixedPoint(self):
+		return self.atFixedPoint
+
+	# A message describing why the simulation stopped early, if it did
+	def getError(self):
+		with self._lock:
+			return self.error
+
+	# The last time each node's route to the destination changed in the
+	# states computed so far, or None when replaying a trace
+	def getLastChangeTimes(self, destination):
+		with self._lock:
+			if self.lastChanges is None:
+				return None
+			return [row[destination] for row in self.lastChanges]
+
+	# The time at which each destination's column converged, or None for
+	# columns that may still change
+	def getDestinationConvergenceTimes(self):
+		with self._lock:
+			if self.lastChanges is None:
+				return None
+			if self.changes is None or len(self.computation) <= self.sweep:
+				return [None for _ in self.lastChanges]
+			# Messages still in flight may change any route, and destinations
+			# that aren't simulated never converge
+			if self._simulator is not None:
+				times = [None for _ in self.lastChanges]
+				if not self.changes:
+					convergenceTimes = bellmanFord.destinationConvergenceTimes(self.lastChanges, self.changes)
+					for j in self._simulator.destinations:
+						times[j] = convergenceTimes[j]
+				return times
+			return bellmanFord.destinationConvergenceTimes(self.lastChanges, self.changes)
+
+	# The (prePeriod, period) of the computation if it has been found to
+	# oscillate, i.e. state prePeriod recurs every period states
+	def getCycle(self):
+		with self._lock:
+			return self.cycle
+
+	# The time within the asynchronous simulation of the current state, or
+	# None for the other schedules
+	def getClockTime(self):
+		with self._lock:
+			if self._simulator is None:
+				return None
+			return self._eventTimes[self.currentTime]
+
+	def getLastTime(self):
+		return self._lastTime() if self.isSimulating else 0
+
 	def getConvergenceTime(self):
-		if self.hasConverged():
-			return len(self.computation)-2
-		else:
-			return None
+		with self._lock:
+			if self.hasConverged():
+				return len(self.computation) - 1 - self.sweep
+			else:
+				return None
+
+	#############
+	## Internal
+
+	# The last time that can be displayed without computing further states
+	def _lastTime(self):
+		with self._lock:
+			return len(self.computation) - 1 - (self.sweep if self.hasConverged() else 0)
+
+	# Computes the states until the computation converges, oscillates or
+	# reaches the given number of steps, staying at most LOOKAHEAD states
+	# ahead of the current one. Errors are kept for the view to show, except
+	# once stopped, as the model may then be torn down underneath the worker.
+	def _simulateInBackground(self, steps):
+		try:
+			while True:
+				with self._lock:
+					if self._stopEvent.is_set():
+						return
+					target = min(self.currentTime + LOOKAHEAD, steps)
+					count = target - (len(self.computation) - 1)
+
+				self.simulate(count)
+
+				with self._lock:
+					if self._stopEvent.is_set():
+						return
+					if self.hasConverged() or self.cycle is not None or len(self.computation) - 1 >= steps:
+						break
+					waiting = len(self.computation) - 1 >= self.currentTime + LOOKAHEAD
+					if waiting:
+						self._idle = True
+						self._wakeEvent.clear()
+				if waiting:
+					self._wakeEvent.wait()
+
+			if self.hasConverged():
+				self._checkFixedPoint()
+		except Exception as e:
+			with self._lock:
+				if not self._stopEvent.is_set():
+					self.error = "The simulation stopped: " + str(e)
+
+	# Lets a waiting worker compute further ahead of the current time
+	def _wakeWorker(self):
+		with self._lock:
+			if self._idle:
+				self._idle = False
+				self._wakeEvent.set()
+
+	# For increasing algebras, over the edges of the graph, every schedule
+	# converges to the same routes to the source. These are only computed by
+	# Dijkstra's algorithm once asked for, and so are None otherwise.
+	def _hasFixedPoint(self):
+		if not self._increasing:
+			return False
+		return self._simulator is None or self.graph.sourceNode in self._simulator.destinations
+
+	def _getFixedPoint(self):
+		with self._lock:
+			if self._fixedPoint is None and self._hasFixedPoint():
+				key = dijkstra.createRouteKey(self.algebra)
+				dependents = dijkstra.createDependentEdgeLists(self.neighbours)
+				self._fixedPoint = dijkstra.solveDestination(self.algebra, self.identityMatrix, dependents, self.graph.sourceNode, key)
+			return self._fixedPoint
+
+	def _checkFixedPoint(self):
+		routes = self._getFixedPoint()
+		if routes is None:
+			return
+		source = self.graph.sourceNode
+		with self._lock:
+			state = self.computation[-1]
+			if any(row[source] != route for row, route in zip(state, routes)):
+				self.error = "The simulation converged to different routes to the source than Dijkstra's algorithm"
+
+	# The states computed so far are all in the history, so the first to recur
+	# is found by comparing states a period apart
+	def _foundCycle(self, period):
+		same = lambda s, t : self.computation[s] == self.computation[t]
+		with self._lock:
+			self.cycle = (cycles.findPrePeriod(0, lambda t : t + 1, period, same), period)
+
+	# The step function for the asynchronous schedule, applying the route
+	# changes logged between the state at the given time and the next. The
+	# simulator is only run further when the next state is new.
+	def _applyEvents(self, state, changes, time):
+		if time == len(self._eventLog):
+			self._eventLog.append(self._simulator.step() or [])
+			self._eventTimes.append(self._simulator.time)
+
+		newState = list(state)
+		newChanges = set()
+		for i, j, route in self._eventLog[time]:
+			if newState[i] is state[i]:
+				newState[i] = list(state[i])
+			newState[i][j] = route
+			newChanges.add((i, j))
+		return newState, newChanges
+
+	# Tells the worker to stop after its current step without waiting for it
+	def _stopWorker(self):
+		self._stopEvent.set()
+		self._wakeEvent.set()
+
+	# The worker shares the model's fields, so it has to have finished before
+	# another simulation is set up
+	def _joinWorker(self):
+		if self._worker is not None:
+			self._stopWorker()
+			self._worker.join()
+			self._worker = None
+
+	# Returns the state after the one at the given time and the set of entries
+	# that changed
+	def _iterate(self, state, changes, time):
+		if self.isNumeric:
+			return numericBellmanFord.iterateWithChanges(self.algebra, state, self.identityMatrix, self.adjacencyMatrix)
+		return self._step(state, changes, time)
 
 
 ##########
@@ -180,17 +642,82 @@ class SimulationView(tkinter.Frame):
 		self.commandB	= tkinter.Button(self, width=5)
 		self.forwardsB 	= tkinter.Button(self, text=">", command=controller.moveForwards)
 		self.endB 		= tkinter.Button(self, text=">>",command=controller.moveToEnd)
+
+		self.recordTraceV 	= tkinter.IntVar()
+		self.recordTraceChB = tkinter.Checkbutton(self, text="Record trace", variable=self.recordTraceV)
+		self.replayB 		= tkinter.Button(self, text="Replay trace", command=controller.replaySimulation)
+		self.timelineS 		= tkinter.Scale(self, orient=tkinter.HORIZONTAL, from_=0, to=0, showvalue=True, command=controller.moveToTime)
+
+		self.scheduleV 	= tkinter.StringVar()
+		self.scheduleL 	= tkinter.Label(self, text="Schedule:")
+		self.scheduleCB = tkinter.ttk.Combobox(self, textvariable=self.scheduleV, values=bellmanFord.SCHEDULES + [ASYNCHRONOUS], state="readonly", width=12)
+		self.scheduleCB.current(0)
+		self.orderL 	= tkinter.Label(self, text="Node order:")
+		self.orderE 	= tkinter.Entry(self, width=14)
+		self.seedL 		= tkinter.Label(self, text="Delay seed:")
+		self.seedE 		= tkinter.Entry(self, width=14)
+		self.errorL 	= tkinter.Label(self, fg="red", wraplength=200, justify=tkinter.LEFT)
 		
 		self.startB.grid(row=0,column=1)
 		self.backB.grid(row=0,column=2)
 		self.commandB.grid(row=0,column=3)
 		self.forwardsB.grid(row=0,column=4)
 		self.endB.grid(row=0,column=5)
+		self.recordTraceChB.grid(row=1,column=1,columnspan=2,sticky="W")
+		self.replayB.grid(row=1,column=4,columnspan=2,sticky="E")
+		self.timelineS.grid(row=2,column=1,columnspan=5,sticky="EW")
+		self.scheduleL.grid(row=3,column=1,columnspan=2,sticky="W")
+		self.scheduleCB.grid(row=3,column=3,columnspan=3,sticky="W")
+		self.orderL.grid(row=4,column=1,columnspan=2,sticky="W")
+		self.orderE.grid(row=4,column=3,columnspan=3,sticky="W")
+		self.seedL.grid(row=5,column=1,columnspan=2,sticky="W")
+		self.seedE.grid(row=5,column=3,columnspan=3,sticky="W")
+		self.errorL.grid(row=6,column=1,columnspan=5,sticky="W")
+		self.errorL.grid_remove()
 
 		self.grid_columnconfigure(0, weight=1)
 		self.grid_columnconfigure(6, weight=1)
 
 
+	############
+	## Getters
+
+	def getRecordTrace(self):
+		return bool(self.recordTraceV.get())
+
+	# The order is a list of node ids separated by spaces or commas, with the
+	# nodes in increasing order if it is left empty
+	def getSchedule(self):
+		try:
+			order = [int(node) for node in self.orderE.get().replace(",", " ").split()]
+		except ValueError:
+			raise Exception("The node order must be a list of node ids")
+		return self.scheduleV.get(), order or None
+
+	# Asynchronous link delays are random if a seed is given, and otherwise
+	# all the same
+	def getDelaySeed(self):
+		seed = self.seedE.get().strip()
+		try:
+			return int(seed) if seed else None
+		except ValueError:
+			raise Exception("The delay seed must be a whole number")
+
+	#############
+	## Setters
+
+	# Shows why the simulation couldn't be started, or clears the message
+	def showError(self, message):
+		self.errorL.configure(text=message or "")
+		if message:
+			self.errorL.grid()
+		else:
+			self.errorL.grid_remove()
+
+	def setTimeline(self, time, lastTime):
+		self.timelineS.configure(to=lastTime)
+		self.timelineS.set(time)
+
 	#######################
 	## Configure buttons ##
 	#######################
@@ -200,6 +727,13 @@ class SimulationView(tkinter.Frame):
 		self.backB.configure(state=tkinter.DISABLED)
 		self.forwardsB.configure(state=tkinter.DISABLED)
 		self.endB.configure(state=tkinter.DISABLED)
+		self.recordTraceChB.configure(state=tkinter.NORMAL)
+		self.replayB.configure(state=tkinter.NORMAL)
+		self.scheduleCB.configure(state="readonly")
+		self.orderE.configure(state=tkinter.NORMAL)
+		self.seedE.configure(state=tkinter.NORMAL)
+		self.setTimeline(0, 0)
+		self.timelineS.configure(state=tkinter.DISABLED)
 
 		self.commandB.configure(text="Start", command=self.controller.startSimulation)
 
@@ -208,5 +742,11 @@ class SimulationView(tkinter.Frame):
 		self.backB.configure(state=tkinter.ACTIVE if back else tkinter.DISABLED)
 		self.forwardsB.configure(state=tkinter.ACTIVE if forward else tkinter.DISABLED)
 		self.endB.configure(state=tkinter.ACTIVE if end else tkinter.DISABLED)
+		self.recordTraceChB.configure(state=tkinter.DISABLED)
+		self.replayB.configure(state=tkinter.DISABLED)
+		self.scheduleCB.configure(state=tkinter.DISABLED)
+		self.orderE.configure(state=tkinter.DISABLED)
+		self.seedE.configure(state=tkinter.DISABLED)
+		self.timelineS.configure(state=tkinter.NORMAL)
 
 		self.commandB.configure(text="Stop", command=self.controller.endSimulation)
\ No newline at end of file
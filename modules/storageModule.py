@@ -1,7 +1,12 @@
-import pickle
+import threading
 import tkinter
 
 import settings
+import theory.problemFormat as problemFormat
+
+# How often the view checks whether a file being loaded in the background
+# has been read (ms)
+LOAD_POLL_INTERVAL = 20
 
 ################
 ## Controller ##
@@ -26,9 +31,8 @@ class StorageController():
 			self._save(filename)
 			
 	def _save(self, filename):
-		file = open(filename, 'wb')
 		data = self._saveCallback()
-		pickle.dump(data, file)
+		problemFormat.writeProblemFile(filename, data)
 
 
 	def load(self):
@@ -37,9 +41,27 @@ class StorageController():
 			self._load(filename)
 
 	def _load(self, filename):
-		data = pickle.load(open(filename, 'rb'))
+		data = problemFormat.loadSaveData(filename)
 		self._loadCallback(data)
 
+	# Reads the file on a background thread so the view stays responsive,
+	# and only passes it on to be displayed once it has been read
+	def loadInBackground(self, filename):
+		result = {}
+
+		def read():
+			result['data'] = problemFormat.loadSaveData(filename)
+
+		reader = threading.Thread(target=read, daemon=True)
+		reader.start()
+		self._waitForLoad(reader, result)
+
+	def _waitForLoad(self, reader, result):
+		if reader.is_alive():
+			self._view.after(LOAD_POLL_INTERVAL, self._waitForLoad, reader, result)
+		elif 'data' in result:
+			self._loadCallback(result['data'])
+
 ##########
 ## View ##
 ##########
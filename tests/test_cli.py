@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import PathVisionCLI
+import theory.bellmanFord as bellmanFord
+import theory.routingProblem as routingProblem
+from theory.eventSimulator import ASYNCHRONOUS
+
+def example(name):
+	return os.path.join(ROOT, "examples", name + ".pv")
+
+def run(capsys, args):
+	status = PathVisionCLI.main(args + ["--workers", "1"])
+	return status, [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+def testSolvesEveryFileInOrder(capsys):
+	files = [example("quadratic"), example("maxmin"), example("non_linear_counterexample")]
+	status, results = run(capsys, files)
+	assert status == 0
+	assert [result["file"] for result in results] == files
+
+	for filename, result in zip(files, results):
+		data 	= routingProblem.loadProblem(filename)
+		algebra = routingProblem.problemAlgebra(data)
+		adM 	= routingProblem.problemAdjacencyMatrix(algebra, data)
+		idM 	= bellmanFord.createIdentityMatrix(algebra, len(adM))
+		states 	= bellmanFord.solve(algebra, idM, idM, adM, 1000)
+		assert result["nodes"] == len(adM)
+		assert result["converged"] == (states[-1] == states[-2])
+		assert result["finalState"] == [[PathVisionCLI.routeToJSON(route) for route in row] for row in states[-1]]
+
+@pytest.mark.parametrize("schedule", bellmanFord.SCHEDULES + [ASYNCHRONOUS])
+def testSchedulesAgreeOnIncreasingAlgebras(capsys, schedule):
+	status, results = run(capsys, [example("maxmin"), "--schedule", schedule, "--destinations", "0", "2"])
+	assert status == 0
+	expected = PathVisionCLI.solveProblem(example("maxmin"), 1000, destinations=[0, 2])
+	assert results[0]["converged"]
+	assert results[0]["destinations"] == [0, 2]
+	assert results[0]["finalState"] == expected["finalState"]
+
+def testReportsFailuresPerFile(capsys, tmp_path):
+	corrupt = str(tmp_path / "corrupt.pv")
+	with open(corrupt, "wb") as f:
+		f.write(b"not a routing problem")
+	missing = str(tmp_path / "missing.pv")
+
+	status, results = run(capsys, [missing, example("quadratic"), corrupt])
+	assert status == 1
+	assert [result["file"] for result in results] == [missing, example("quadratic"), corrupt]
+	assert "error" in results[0] and "error" in results[2]
+	assert "error" not in results[1] and results[1]["converged"]
+
+def testOrderNeedsFilesOfOneSize(capsys):
+	with pytest.raises(SystemExit) as exit:
+		PathVisionCLI.main([example("quadratic"), example("maxmin"), "--schedule", bellmanFord.ROUND_ROBIN, "--order", "0", "1", "2", "3", "4", "5", "6"])
+	assert exit.value.code == 2
+	assert "different numbers of nodes (7, 9)" in capsys.readouterr().err
+
+	status, results = run(capsys, [example("quadratic"), example("quadratic"), "--schedule", bellmanFord.ROUND_ROBIN, "--order", "6", "5", "4", "3", "2", "1", "0"])
+	assert status == 0
+	assert len(results) == 2
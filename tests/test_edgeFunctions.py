@@ -0,0 +1,67 @@
+import itertools
+import os
+import pickle
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from theory.algebraExamples import EdgeFunction, compileEdgeFunction, fRandom, fRing, ftimes, fVerify
+
+# F-custom's times as it was before edge functions were compiled, parsing the
+# string on every call
+def stringTimes(f, a, i, j):
+	for p in f.split(":"):
+		if p == "c":
+			return a
+		if p[0] == "i":
+			return a + int(p[1:])
+		if p[0] == "r":
+			if len(p) == 1:
+				return float("inf")
+			else:
+				return max(a, int(p[1:]))
+		if "t" in p:
+			i = p.index("t")
+			i1 = int(p[:i])
+			i2 = int(p[i+1:])
+			if a == i1:
+				return i2
+
+FINALS = ["c", "r", "r0", "r3", "i1", "i4"]
+TIERS = ["0t0", "0t2", "1t3", "2t2", "0t4", "3t7"]
+
+STRINGS = FINALS + [":".join(tiers + (final,)) for count in (1, 2) for tiers in itertools.permutations(TIERS, count) for final in FINALS]
+
+ROUTES = list(range(-1, 9)) + [float("inf")]
+
+def testMatchesTheStringFunction():
+	for string in STRINGS:
+		assert fVerify(string)
+		function = compileEdgeFunction(string)
+		for a in ROUTES:
+			assert function(a) == stringTimes(string, a, 0, 1)
+			assert ftimes(function, a, 0, 1) == stringTimes(string, a, 0, 1)
+			# Plain strings from older files are still accepted
+			assert ftimes(string, a, 0, 1) == stringTimes(string, a, 0, 1)
+
+def testRandomEdges():
+	rng = random.Random(0)
+	for _ in range(200):
+		function = fRandom(rng)
+		assert isinstance(function, EdgeFunction) and fVerify(function.string)
+		for a in ROUTES:
+			assert fRing.times(function, a, 0, 1) == stringTimes(function.string, a, 0, 1)
+
+def testCompiledOnce():
+	function = compileEdgeFunction("0t2:i1")
+	assert compileEdgeFunction("0t2:i1") is function
+	assert compileEdgeFunction(function) is function
+	assert pickle.loads(pickle.dumps(function)) is function
+
+def testComparesLikeItsString():
+	function = compileEdgeFunction("1t3:c")
+	assert function == "1t3:c" and function == EdgeFunction("1t3:c")
+	assert function != compileEdgeFunction("c")
+	assert hash(function) == hash("1t3:c")
+	assert str(function) == repr(function) == "1t3:c"
@@ -0,0 +1,308 @@
+import glob
+import os
+import random
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import theory.bellmanFord as bellmanFord
+import theory.cycles as cycles
+import theory.dijkstra as dijkstra
+import theory.numericBellmanFord as numericBellmanFord
+import theory.routingProblem as routingProblem
+import theory.traceFormat as traceFormat
+from theory.algebra import Algebra, DisplayAlgebra, routeKey
+from theory.algebraExamples import findAlgebra
+from theory.eventSimulator import EventSimulator
+from theory.history import CheckpointedHistory
+from theory.minimise import ddmin
+from theory.paths import TuplePath, createPath
+from theory.randomSearch import createRandomAdjacencyMatrix, generateInstance
+
+# Checks every engine against bellmanFord.solve on the bundled examples, each
+# with and without paths being tracked. As the examples all converge and none
+# of them is numeric, a few random instances are added, including one that
+# oscillates.
+
+EXAMPLES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples", "*.pv")))
+
+# (algebra name, seed) of random instances, F-custom 434 oscillating
+RANDOM_INSTANCES = [("(N, min, +)", 0), ("(N, min, +)", 1), ("(N, max, min)", 0), ("F-custom", 434)]
+
+LIMIT = 200
+
+def loadExample(filename, withPaths):
+	data 	= routingProblem.loadProblem(filename)
+	algebra = routingProblem.problemAlgebra(data)
+	if withPaths and not data['withPaths']:
+		algebra = DisplayAlgebra.trackPaths(algebra)
+	adM = routingProblem.problemAdjacencyMatrix(algebra, data)
+	idM = bellmanFord.createIdentityMatrix(algebra, len(adM))
+	return algebra, idM, adM
+
+def randomExample(name, seed, withPaths):
+	algebra = findAlgebra(name)
+	rng = random.Random(seed)
+	# Random integer edges are None when there is no edge
+	adM = [[algebra.invalidEdge if e is None else e for e in row] for row in createRandomAdjacencyMatrix(algebra, rng.randint(3, 6), rng)]
+	if withPaths:
+		algebra = DisplayAlgebra.trackPaths(algebra)
+	idM = bellmanFord.createIdentityMatrix(algebra, len(adM))
+	return algebra, idM, adM
+
+def converged(states):
+	return len(states) >= 2 and states[-1] == states[-2]
+
+EXAMPLE_PARAMS = [(loadExample, (f, p), os.path.basename(f)) for f in EXAMPLES for p in (False, True)] \
+	+ [(randomExample, (name, seed, p), name + " " + str(seed)) for name, seed in RANDOM_INSTANCES for p in (False, True)]
+
+@pytest.fixture(params=EXAMPLE_PARAMS, ids=lambda x : x[2] + (" + paths" if x[1][-1] else ""))
+def example(request):
+	load, args, _ = request.param
+	algebra, idM, adM = load(*args)
+	return algebra, idM, adM, bellmanFord.solve(algebra, idM, idM, adM, LIMIT)
+
+#############
+## Engines
+
+def testSolveMatchesDenseIteration(example):
+	algebra, idM, adM, states = example
+	state = idM
+	for expected in states[1:]:
+		state = bellmanFord.iterate(algebra, state, idM, adM)
+		assert state == expected
+
+def testIncrementalIteration(example):
+	algebra, idM, adM, states = example
+	neighbours = bellmanFord.adjacencyMatrixToNeighbourLists(algebra, adM)
+	dependents = bellmanFord.createDependentLists(neighbours)
+	state, changes = idM, None
+	for expected in states[1:]:
+		state, changes = bellmanFord.incrementalIterate(algebra, state, idM, neighbours, dependents, changes)
+		assert state == expected
+
+def testNumericEngine(example):
+	algebra, idM, adM, states = example
+	if not numericBellmanFord.isApplicable(algebra):
+		pytest.skip("not a numeric semiring")
+	assert numericBellmanFord.solve(algebra, idM, idM, adM, LIMIT) == states
+
+def testParallelSolve(example):
+	algebra, idM, adM, states = example
+	# Columns that converge early are padded with their final state, which
+	# is what the whole computation has in those columns
+	assert bellmanFord.parallelSolve(algebra, idM, idM, adM, LIMIT, workers=1) == states
+	assert bellmanFord.parallelSolve(algebra, idM, idM, adM, LIMIT, workers=2) == states
+
+def testDijkstra(example):
+	algebra, idM, adM, states = example
+	if not dijkstra.isApplicable(algebra):
+		pytest.skip("not an increasing algebra")
+	assert converged(states)
+	neighbours = bellmanFord.adjacencyMatrixToNeighbourLists(algebra, adM)
+	assert dijkstra.solve(algebra, idM, neighbours) == states[-1]
+
+def testDijkstraNeedsIncreasingEdges():
+	algebra = findAlgebra("(N, min, +)")
+	adM = [[algebra.invalidEdge for _ in range(3)] for _ in range(3)]
+	adM[1][0], adM[2][0], adM[1][2] = 1, 5, -10
+	idM = bellmanFord.createIdentityMatrix(algebra, 3)
+	neighbours = bellmanFord.adjacencyMatrixToNeighbourLists(algebra, adM)
+	assert dijkstra.isApplicable(algebra)
+	assert not dijkstra.isApplicable(algebra, neighbours)
+	assert bellmanFord.solve(algebra, idM, idM, adM, LIMIT)[-1][1][0] == -5
+
+	adM[1][2] = 10
+	neighbours = bellmanFord.adjacencyMatrixToNeighbourLists(algebra, adM)
+	assert dijkstra.isApplicable(algebra, neighbours)
+	assert dijkstra.solve(algebra, idM, neighbours) == bellmanFord.solve(algebra, idM, idM, adM, LIMIT)[-1]
+
+def testHashConsedAlgebra(example):
+	algebra, idM, adM, states = example
+	assert bellmanFord.solve(Algebra.hashConsed(algebra), idM, idM, adM, LIMIT) == states
+
+###############
+## Schedules
+
+@pytest.mark.parametrize("schedule", bellmanFord.SCHEDULES)
+def testSchedulesReachTheFixedPoint(example, schedule):
+	algebra, idM, adM, states = example
+	if not converged(states):
+		pytest.skip("doesn't converge synchronously")
+	order = list(range(len(adM)))
+	random.Random(0).shuffle(order)
+	finalState, convergenceTime = bellmanFord.scheduledSolve(algebra, idM, idM, adM, schedule, order, LIMIT * len(adM))
+	# Every schedule from the identity state reaches the same fixed point for
+	# algebras where it is unique
+	if dijkstra.isApplicable(algebra):
+		assert finalState == states[-1]
+	if convergenceTime is not None:
+		assert bellmanFord.iterate(algebra, finalState, idM, adM) == finalState
+
+def testSynchronousScheduleMatchesSolve(example):
+	algebra, idM, adM, states = example
+	finalState, convergenceTime = bellmanFord.scheduledSolve(algebra, idM, idM, adM, bellmanFord.SYNCHRONOUS, None, LIMIT)
+	assert finalState == states[-1]
+	assert convergenceTime == (len(states) - 2 if converged(states) else None)
+
+@pytest.mark.parametrize("seed", [None, 1])
+def testEventSimulator(example, seed):
+	algebra, idM, adM, states = example
+	if not dijkstra.isApplicable(algebra):
+		pytest.skip("the fixed point reached may depend on the delays")
+	neighbours = bellmanFord.adjacencyMatrixToNeighbourLists(algebra, adM)
+	simulator = EventSimulator(algebra, neighbours, seed=seed)
+	while simulator.step() is not None:
+		pass
+	assert simulator.hasConverged()
+	n = len(adM)
+	assert [[simulator.getRoute(i, j) for j in range(n)] for i in range(n)] == states[-1]
+
+def testEventSimulatorDestinations(example):
+	algebra, idM, adM, states = example
+	if not dijkstra.isApplicable(algebra):
+		pytest.skip("the fixed point reached may depend on the delays")
+	neighbours = bellmanFord.adjacencyMatrixToNeighbourLists(algebra, adM)
+	simulator = EventSimulator(algebra, neighbours, destinations=[0])
+	while simulator.step() is not None:
+		pass
+	assert [simulator.getRoute(i, 0) for i in range(len(adM))] == [row[0] for row in states[-1]]
+
+def engines(algebra):
+	return [bellmanFord, numericBellmanFord] if numericBellmanFord.isApplicable(algebra) else [bellmanFord]
+
+def testConvergenceTimeLimit(example):
+	algebra, idM, adM, states = example
+	for engine in engines(algebra):
+		for limit in sorted({2, 3, len(states) - 1, len(states), LIMIT}):
+			limited = bellmanFord.solve(algebra, idM, idM, adM, limit)
+			expected = len(limited) - 2 if converged(limited) else None
+			assert engine.convergenceTime(algebra, idM, idM, adM, limit) == expected
+
+		_, destinationTimes = bellmanFord.solveDestinations(algebra, idM, idM, adM, LIMIT)
+		assert engine.probeDestinations(algebra, idM, idM, adM, LIMIT)[1] == destinationTimes
+
+def testConvergenceTimeDeadline(example):
+	algebra, idM, adM, states = example
+	for engine in engines(algebra):
+		assert engine.convergenceTime(algebra, idM, idM, adM, LIMIT, time.time() + 60) == (len(states) - 2 if converged(states) else None)
+		# Once the deadline has passed the computation stops after at most
+		# one iteration
+		if len(states) > 3:
+			assert engine.convergenceTime(algebra, idM, idM, adM, LIMIT, time.time() - 1) is None
+
+@pytest.mark.parametrize("name", ["(N, min, +)", "(N, max, min)"])
+@pytest.mark.parametrize("limit", [2, 4, LIMIT])
+def testBatchConvergenceTimes(name, limit):
+	algebra = findAlgebra(name)
+	if not numericBellmanFord.isApplicable(algebra):
+		pytest.skip("numpy isn't installed")
+	idM = bellmanFord.createIdentityMatrix(algebra, 6)
+	# Random integer edges are None when there is no edge
+	adMs = [[[algebra.invalidEdge if e is None else e for e in row] for row in generateInstance(algebra, 6, 5, trial)] for trial in range(40)]
+	adAs = numericBellmanFord.numpy.array([numericBellmanFord.toArray(algebra, adM) for adM in adMs])
+	times = numericBellmanFord.batchConvergenceTimes(algebra, numericBellmanFord.toArray(algebra, idM), adAs, limit)
+	assert times == [bellmanFord.convergenceTime(algebra, idM, idM, adM, limit) for adM in adMs]
+	if limit == LIMIT:
+		assert None not in times
+
+############
+## Cycles
+
+def testProbeCycle(example):
+	algebra, idM, adM, states = example
+	cycle, _ = bellmanFord.probeCycle(algebra, idM, idM, adM, LIMIT)
+	if converged(states):
+		assert cycle == (len(states) - 2, 1)
+	else:
+		prePeriod, period = cycle
+		assert states[prePeriod] == states[prePeriod + period]
+		assert all(states[t] != states[t + period] for t in range(prePeriod))
+		assert all(states[prePeriod] != states[prePeriod + p] for p in range(1, period))
+
+def testNumericProbeCycle(example):
+	algebra, idM, adM, states = example
+	if not numericBellmanFord.isApplicable(algebra):
+		pytest.skip("not a numeric semiring")
+	for limit in [2, 3, LIMIT]:
+		assert numericBellmanFord.probeCycle(algebra, idM, idM, adM, limit) == bellmanFord.probeCycle(algebra, idM, idM, adM, limit)
+
+def testNumericProbeCycleWithoutRecurrence():
+	# The negative cycle between nodes 0 and 1 makes their routes keep falling
+	algebra = findAlgebra("(N, min, +)")
+	inf = algebra.invalidEdge
+	adM = [[inf, -3, inf], [1, inf, inf], [2, inf, inf]]
+	idM = bellmanFord.createIdentityMatrix(algebra, 3)
+	cycle, destinationTimes = numericBellmanFord.probeCycle(algebra, idM, idM, adM, LIMIT)
+	assert cycle is None
+	assert (cycle, destinationTimes) == bellmanFord.probeCycle(algebra, idM, idM, adM, LIMIT)
+
+def testCycleDetector():
+	# 0, 1, 2, 3 then 4, 5, 6 repeating
+	sequence = lambda t : t if t < 4 else 4 + (t - 4) % 3
+	detector = cycles.CycleDetector(fingerprint=hash)
+	t = 0
+	while not detector.add(sequence(t)):
+		t += 1
+	assert detector.period == 3
+	assert cycles.findPrePeriod(0, lambda t : t + 1, 3, lambda s, t : sequence(s) == sequence(t)) == 4
+
+def testDDMin():
+	needed = {3, 7, 8}
+
+	def test(candidates):
+		return [needed <= set(candidate) for candidate in candidates]
+
+	assert sorted(ddmin(range(20), test)) == [3, 7, 8]
+	assert ddmin(range(5), lambda candidates : [True for _ in candidates]) == []
+
+#############
+## Storage
+
+def testCheckpointedHistory(example):
+	algebra, idM, adM, states = example
+	neighbours = bellmanFord.adjacencyMatrixToNeighbourLists(algebra, adM)
+	step = bellmanFord.createScheduleStep(algebra, idM, neighbours, bellmanFord.SYNCHRONOUS)
+	history = CheckpointedHistory(step, 4, interval=2)
+	for state in states:
+		history.append(state)
+	assert len(history) == len(states)
+	for t in reversed(range(len(states))):
+		assert history[t] == states[t]
+
+def testTraceFormat(example, tmp_path):
+	algebra, idM, adM, states = example
+	filename = str(tmp_path / "trace")
+	numeric = numericBellmanFord.isApplicable(algebra)
+	writer = traceFormat.TraceWriter(filename, len(adM), numeric, algebra.name, bellmanFord.SYNCHRONOUS, 1)
+	for state in states:
+		writer.append(state)
+	writer.close()
+
+	reader = traceFormat.TraceReader(filename)
+	assert (reader.algebra, reader.schedule, reader.sweep) == (algebra.name, bellmanFord.SYNCHRONOUS, 1)
+	assert [reader[t] for t in range(len(reader))] == states
+	reader.close()
+
+def testTraceFormatKeepsRouteTypes(tmp_path):
+	filename = str(tmp_path / "trace")
+	states = [
+		[[1, 1.0], [True, float("inf")]],
+		[[(3, createPath([3, 0], TuplePath)), (3, createPath([3, 0]))], [(0, TuplePath.empty), None]]
+	]
+	writer = traceFormat.TraceWriter(filename, 2, False)
+	for state in states:
+		writer.append(state)
+	writer.close()
+
+	reader = traceFormat.TraceReader(filename)
+	for t, state in enumerate(states):
+		replayed = reader[t]
+		for row, replayedRow in zip(state, replayed):
+			for route, replayedRoute in zip(row, replayedRow):
+				assert routeKey(replayedRoute) == routeKey(route)
+	assert repr(reader[1][0][0]) == "(3, (3, 0))"
+	reader.close()
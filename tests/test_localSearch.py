@@ -0,0 +1,75 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import theory.localSearch as localSearch
+from theory.algebraExamples import findAlgebra
+
+STRATEGIES = sorted(localSearch.strategies)
+
+def record(strategy, algebra, size, totalRuns, seed):
+	return list(localSearch.strategies[strategy](algebra, size, totalRuns, None, random.Random(seed)))
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def testRegenerateInstance(strategy):
+	algebra = findAlgebra("(N, min, +)")
+	steps = record(strategy, algebra, 4, 120, 5)
+
+	best = None
+	for runs, _, adM in steps:
+		if adM is not None:
+			best = adM
+		assert localSearch.regenerateInstance(strategy, algebra, 4, 120, 5, runs) == best
+
+# Scores instances by their number of edges, so every improvement is known
+def countEdges(algebra):
+	return lambda adMs : [sum(e != algebra.invalidEdge and e is not None for row in adM for e in row) for adM in adMs]
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+@pytest.mark.parametrize("totalRuns", [1, 37, 200])
+def testStrategiesReportTheirBestInstances(strategy, totalRuns):
+	algebra = findAlgebra("(N, max, min)")
+	calculateScores = countEdges(algebra)
+	steps = list(localSearch.strategies[strategy](algebra, 5, totalRuns, calculateScores, random.Random(0)))
+
+	runs = [r for r, _, _ in steps]
+	assert runs == sorted(runs) and runs[-1] == totalRuns
+	bestScores = [score for _, score, _ in steps]
+	assert bestScores == sorted(bestScores)
+
+	# An instance is only reported with the score it improved the best to
+	assert steps[0][2] is not None
+	for i, (_, score, adM) in enumerate(steps):
+		if adM is not None:
+			assert calculateScores([adM]) == [score]
+			assert i == 0 or score > bestScores[i - 1]
+		else:
+			assert i > 0 and score == bestScores[i - 1]
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def testStrategiesAreReproducible(strategy):
+	algebra = findAlgebra("F-custom")
+	assert repr(record(strategy, algebra, 4, 60, 9)) == repr(record(strategy, algebra, 4, 60, 9))
+
+def testMutateChangesOneEdge():
+	algebra = findAlgebra("(N, min, +)")
+	rng = random.Random(1)
+	adM = [[algebra.invalidEdge if i == k else 1 for k in range(5)] for i in range(5)]
+	for _ in range(50):
+		mutated = localSearch.mutate(algebra, adM, rng)
+		changed = [(i, k) for i in range(5) for k in range(5) if mutated[i][k] != adM[i][k]]
+		assert len(changed) <= 1 and all(i != k for i, k in changed)
+	assert adM == [[algebra.invalidEdge if i == k else 1 for k in range(5)] for i in range(5)]
+
+def testCrossoverTakesEachRowFromAParent():
+	rng = random.Random(2)
+	adM1 = [[1, 2], [3, 4]]
+	adM2 = [[5, 6], [7, 8]]
+	for _ in range(20):
+		child = localSearch.crossover(adM1, adM2, rng)
+		assert all(row in (row1, row2) for row, row1, row2 in zip(child, adM1, adM2))
+		assert all(row is not row1 and row is not row2 for row, row1, row2 in zip(child, adM1, adM2))
@@ -0,0 +1,75 @@
+import os
+import pickle
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from theory.paths import Path, TuplePath, createPath, emptyPath, emptyTuplePath
+
+# Random lists of distinct nodes, with shared prefixes and suffixes
+def randomNodeLists(seed, count=60):
+	rng = random.Random(seed)
+	lists = [[]]
+	for _ in range(count):
+		nodes = rng.sample(range(70), rng.randint(1, 6))
+		lists.append(nodes)
+		lists.append(nodes[1:])
+		lists.append(nodes[:-1])
+	return lists
+
+def testBehavesLikeAList():
+	for nodes in randomNodeLists(0):
+		path = createPath(nodes)
+		assert list(path) == nodes
+		assert len(path) == len(nodes)
+		assert [path[i] for i in range(-len(nodes), len(nodes))] == nodes + nodes
+		assert repr(path) == repr(nodes)
+		assert all(node in path for node in nodes)
+		assert all(node not in path for node in range(70) if node not in nodes)
+		with pytest.raises(IndexError):
+			path[len(nodes)]
+
+def testOrderingMatchesLists():
+	lists = randomNodeLists(1)
+	paths = [createPath(nodes) for nodes in lists]
+	for p, a in zip(paths, lists):
+		for q, b in zip(paths, lists):
+			assert (p < q) == (a < b)
+			assert (p == q) == (a == b)
+	assert [list(p) for p in sorted(paths)] == sorted(lists)
+	assert min(paths) is emptyPath
+
+def testHashing():
+	lists = randomNodeLists(2)
+	paths = [createPath(nodes) for nodes in lists]
+	# Paths built by extending others hash and compare as if built directly
+	extended = [createPath(nodes[1:]).extend(nodes[0]) if nodes else emptyPath for nodes in lists]
+	for p, q in zip(paths, extended):
+		assert p == q and hash(p) == hash(q)
+	assert len(set(paths)) == len({tuple(nodes) for nodes in lists})
+	assert {path : True for path in paths}[createPath(lists[5])]
+
+def testExtendSharesTheTail():
+	path = createPath([3, 1, 0])
+	longer = path.extend(4)
+	assert longer.tail is path
+	assert list(longer) == [4, 3, 1, 0]
+	assert list(path) == [3, 1, 0]
+
+def testTuplePaths():
+	path = emptyTuplePath.extend(0).extend(3)
+	assert type(path) is TuplePath
+	assert repr(path) == "(3, 0)"
+	assert createPath([3, 0], TuplePath) == path
+	assert type(createPath([3, 0], TuplePath)) is TuplePath
+
+@pytest.mark.parametrize("pathType", [Path, TuplePath])
+def testPickling(pathType):
+	path = createPath([5, 2, 9], pathType)
+	copy = pickle.loads(pickle.dumps(path))
+	assert type(copy) is pathType
+	assert copy == path and hash(copy) == hash(path)
+	assert 9 in copy and 4 not in copy
@@ -0,0 +1,110 @@
+import glob
+import os
+import pickle
+import struct
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import theory.problemFormat as problemFormat
+from theory.algebra import routeKey
+from theory.algebraExamples import EdgeFunction, compileEdgeFunction
+
+EXAMPLES = sorted(glob.glob(os.path.join(ROOT, "examples", "*.pv")))
+
+def createProblem(weights, delays=None, nodes=(0, 1, 2)):
+	links = []
+	for e, weight in enumerate(weights):
+		link = {'source' : nodes[(e + 1) % len(nodes)], 'target' : nodes[e % len(nodes)], 'weight' : weight}
+		if delays is not None and delays[e] is not None:
+			link['delay'] = delays[e]
+		links.append(link)
+	return {
+		'edgeList'	: {'directed' : True, 'multigraph' : False, 'graph' : {}, 'nodes' : [{'id' : n} for n in nodes], 'links' : links},
+		'pos'		: {n : [float(i), -float(i)] for i, n in enumerate(nodes)},
+		'source'	: nodes[0],
+		'algebra'	: "(N, min, +)",
+		'withPaths'	: False
+	}
+
+def roundTrip(data, tmp_path):
+	filename = str(tmp_path / "problem.pv")
+	problemFormat.writeProblemFile(filename, data)
+	assert problemFormat.isProblemFile(filename)
+	return problemFormat.loadSaveData(filename)
+
+def linkKeys(data):
+	return [(link['source'], link['target'], routeKey(link.get('weight')), link.get('delay')) for link in data['edgeList']['links']]
+
+@pytest.mark.parametrize("filename", EXAMPLES, ids=os.path.basename)
+def testImportsOldPickles(filename):
+	assert not problemFormat.isProblemFile(filename)
+	with open(filename, 'rb') as file:
+		pickled = pickle.load(file)
+	data = problemFormat.loadSaveData(filename)
+	assert data['algebra'] == pickled['algebra']
+
+	# F-custom edge functions used to be stored as strings
+	for link, pickledLink in zip(data['edgeList']['links'], pickled['edgeList']['links']):
+		if pickled['algebra'] == "F-custom":
+			assert link['weight'] is compileEdgeFunction(pickledLink['weight'])
+		else:
+			assert link['weight'] == pickledLink['weight']
+
+@pytest.mark.parametrize("filename", EXAMPLES, ids=os.path.basename)
+def testExamplesRoundTrip(filename, tmp_path):
+	data = problemFormat.loadSaveData(filename)
+	loaded = roundTrip(data, tmp_path)
+	for key in ['algebra', 'withPaths', 'source']:
+		assert loaded[key] == data[key]
+	assert loaded['pos'] == {n : list(p) for n, p in data['pos'].items()}
+	assert linkKeys(loaded) == linkKeys(data)
+
+@pytest.mark.parametrize("weights, weightType", [
+	([1, -2, 3], problemFormat.INT_WEIGHTS),
+	([1.5, float("inf"), -0.25], problemFormat.FLOAT_WEIGHTS),
+	([1, 2.0, 3], problemFormat.TABLE_WEIGHTS),
+	([True, 2, 3], problemFormat.TABLE_WEIGHTS),
+	([2**70, 1, 2], problemFormat.TABLE_WEIGHTS),
+	([(2, 1), (3, (0, 1.0)), (2, 1)], problemFormat.TABLE_WEIGHTS),
+	([compileEdgeFunction("c"), compileEdgeFunction("0t4:c"), "c"], problemFormat.TABLE_WEIGHTS),
+	([None, None, None], problemFormat.NO_WEIGHTS)
+])
+def testWeightsKeepTheirTypes(weights, weightType, tmp_path):
+	data = createProblem(weights)
+	assert problemFormat._weightType(weights) == weightType
+	loaded = roundTrip(data, tmp_path)
+	for link, weight in zip(loaded['edgeList']['links'], weights):
+		if isinstance(weight, EdgeFunction):
+			assert link['weight'] is weight
+		else:
+			assert routeKey(link.get('weight')) == routeKey(weight)
+
+def testDelaysAndNodeIds(tmp_path):
+	data = createProblem([1, 2, 3], delays=[0.5, None, 2], nodes=(10, 4, 7))
+	loaded = roundTrip(data, tmp_path)
+	# Nodes are renumbered in the order of the node list
+	assert [node['id'] for node in loaded['edgeList']['nodes']] == [0, 1, 2]
+	assert loaded['source'] == 0
+	assert loaded['pos'] == {0 : [0.0, 0.0], 1 : [1.0, -1.0], 2 : [2.0, -2.0]}
+	assert [(link['source'], link['target'], link.get('delay')) for link in loaded['edgeList']['links']] == [(1, 0, 0.5), (2, 1, None), (0, 2, 2.0)]
+
+def testTopologies(tmp_path):
+	data = {'edgeList' : createProblem([None, None])['edgeList'], 'nodePositions' : {0 : [0, 1], 1 : [1, 0], 2 : [2, 2]}, 'sourceNode' : None}
+	loaded = roundTrip(data, tmp_path)
+	assert set(loaded) == {'edgeList', 'nodePositions', 'sourceNode'}
+	assert loaded['sourceNode'] is None
+	assert loaded['nodePositions'] == {0 : [0.0, 1.0], 1 : [1.0, 0.0], 2 : [2.0, 2.0]}
+	assert all('weight' not in link for link in loaded['edgeList']['links'])
+
+def testRejectsNewerVersions(tmp_path):
+	encoded = bytearray(problemFormat.encode(createProblem([1, 2, 3])))
+	struct.pack_into("<H", encoded, len(problemFormat.MAGIC), problemFormat.VERSION + 1)
+	filename = str(tmp_path / "newer.pv")
+	with open(filename, 'wb') as file:
+		file.write(encoded)
+	with pytest.raises(Exception, match="newer"):
+		problemFormat.loadSaveData(filename)
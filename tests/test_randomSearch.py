@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import theory.bellmanFord as bellmanFord
+import theory.randomSearch as randomSearch
+from theory.algebraExamples import findAlgebra
+
+ALGEBRAS = ["(N, min, +)", "F-custom"]
+
+@pytest.mark.parametrize("name", ALGEBRAS)
+def testInstancesDependOnlyOnSeedAndTrial(name):
+	algebra = findAlgebra(name)
+	instances = [randomSearch.generateInstance(algebra, 5, 7, trial) for trial in range(10)]
+	assert instances == [randomSearch.generateInstance(algebra, 5, 7, trial) for trial in range(10)]
+	assert len({repr(adM) for adM in instances}) > 1
+	assert randomSearch.generateInstance(algebra, 5, 8, 0) != instances[0]
+
+@pytest.mark.parametrize("name", ALGEBRAS)
+def testBestOfAChunkCanBeRegenerated(name):
+	algebra = findAlgebra(name)
+	seed, trial, score, trials = randomSearch.searchChunk(algebra, 4, 11, 30)
+	assert (seed, trials) == (11, 30)
+
+	idM = bellmanFord.createIdentityMatrix(algebra, 4)
+	scores = randomSearch.calculateScores(algebra, idM, [randomSearch.generateInstance(algebra, 4, seed, t) for t in range(trials)])
+	assert score == max(scores) == scores[trial]
+	assert randomSearch.calculateScore(algebra, idM, randomSearch.generateInstance(algebra, 4, seed, trial)) == score
+
+def testSearchIsReproducible():
+	algebra = findAlgebra("(N, max, min)")
+	chunks = randomSearch.createChunks(algebra, 200, 3, 2)
+	assert chunks == randomSearch.createChunks(algebra, 200, 3, 2)
+	assert sum(trials for _, trials in chunks) == 200
+
+	results = sorted(randomSearch.search(algebra, 4, chunks, workers=2))
+	assert results == sorted(randomSearch.search(algebra, 4, chunks, workers=1))
+	assert results == sorted(randomSearch.searchChunk(algebra, 4, seed, trials) for seed, trials in chunks)
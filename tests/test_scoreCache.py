@@ -0,0 +1,101 @@
+import os
+import pickle
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import theory.scoreCache as scoreCache
+from theory.algebraExamples import findAlgebra
+from theory.pathalogicalAlgebra import generatePathalogicalAdjacencyMatrix
+from theory.randomSearch import createRandomAdjacencyMatrix
+from theory.scoreCache import ScoreCache
+
+def randomMatrix(name, seed, size=5):
+	algebra = findAlgebra(name)
+	return algebra, createRandomAdjacencyMatrix(algebra, size, random.Random(seed))
+
+def relabel(adM, permutation):
+	n = len(adM)
+	result = [[None for _ in range(n)] for _ in range(n)]
+	for i in range(n):
+		for k in range(n):
+			result[permutation[i]][permutation[k]] = adM[i][k]
+	return result
+
+@pytest.mark.parametrize("name, seed", [("(N, min, +)", 0), ("(N, max, min)", 1), ("F-custom", 2)])
+def testIsomorphicGraphsShareEntries(name, seed):
+	algebra, adM = randomMatrix(name, seed)
+	permutation = list(range(len(adM)))
+	random.Random(seed).shuffle(permutation)
+	relabelled = relabel(adM, permutation)
+
+	cache = ScoreCache(10)
+	key, order = cache.key(algebra, adM)
+	otherKey, otherOrder = cache.key(algebra, relabelled)
+	assert key == otherKey
+
+	# Destination times follow the nodes through the relabelling
+	times = list(range(10, 10 + len(adM)))
+	cache.put(key, order, 7, times)
+	assert cache.get(otherKey, otherOrder) == (7, [times[permutation.index(j)] for j in range(len(adM))])
+	assert cache.hitRate() == 1.0
+
+def testDifferentGraphsHaveDifferentKeys():
+	algebra, adM = randomMatrix("(N, min, +)", 3)
+	changed = [list(row) for row in adM]
+	changed[0][1] = 100
+	cache = ScoreCache(10)
+	assert cache.key(algebra, adM)[0] != cache.key(algebra, changed)[0]
+	assert cache.key(algebra, adM)[0] != ScoreCache(10, limit=5).key(algebra, adM)[0]
+
+def testLabelledAlgebrasAreKeyedByTheirMatrix():
+	algebra = findAlgebra("Pathalogical")
+	assert not algebra.labelIndependent
+	adM = generatePathalogicalAdjacencyMatrix(4)
+	form, order = scoreCache.canonicalOrder(algebra, adM)
+	assert order == list(range(4))
+	assert form == tuple(tuple(scoreCache._weightKey(w) for w in row) for row in adM)
+
+def testEvictsLeastRecentlyUsed():
+	cache = ScoreCache(2)
+	order = [0]
+	cache.put("a", order, 1)
+	cache.put("b", order, 2)
+	assert cache.get("a", order) == (1, None)
+	cache.put("c", order, 3)
+	assert cache.get("b", order) is None
+	assert cache.get("a", order) == (1, None)
+	assert cache.get("c", order) == (3, None)
+	assert (cache.hits, cache.lookups) == (3, 4)
+	assert cache.hitRate() == 0.75
+	cache.resetStatistics()
+	assert cache.hitRate() == 0.0
+
+def testPersistence(tmp_path):
+	filename = str(tmp_path / "cache" / "scores.pickle")
+	algebra, adM = randomMatrix("(N, min, +)", 4)
+	cache = ScoreCache(10, filename, limit=50)
+	key, order = cache.key(algebra, adM)
+	cache.put(key, order, 12, list(range(len(adM))))
+	cache.save()
+
+	loaded = ScoreCache(10, filename, limit=50)
+	assert loaded.get(*loaded.key(algebra, adM)) == (12, list(range(len(adM))))
+	# Scores computed with another limit aren't reused
+	assert ScoreCache(10, filename, limit=60).get(key, order) is None
+
+@pytest.mark.parametrize("contents", [
+	b"not a pickle",
+	pickle.dumps({'version' : scoreCache.CACHE_VERSION - 1, 'limit' : 50, 'scores' : {"key" : (1, None)}}),
+	pickle.dumps({'version' : scoreCache.CACHE_VERSION, 'limit' : 50, 'scores' : ["key"]}),
+	pickle.dumps({'version' : scoreCache.CACHE_VERSION, 'limit' : 50, 'scores' : {"key" : random.Random(0)}})
+], ids=["corrupt", "old version", "not a dictionary", "unexpected object"])
+def testIgnoresUnusableFiles(contents, tmp_path):
+	filename = str(tmp_path / "scores.pickle")
+	with open(filename, 'wb') as file:
+		file.write(contents)
+	cache = ScoreCache(10, filename, limit=50)
+	assert cache.get("key", [0]) is None
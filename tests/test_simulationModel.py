@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+
+import networkx as nx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import modules.simulationModule as simulationModule
+import theory.bellmanFord as bellmanFord
+from theory.algebraExamples import findAlgebra
+from theory.eventSimulator import ASYNCHRONOUS
+
+SCHEDULES = bellmanFord.SCHEDULES + [ASYNCHRONOUS]
+
+def createGraph(n, edges, source=0):
+	graph = nx.DiGraph()
+	graph.add_nodes_from(range(n))
+	for i, k, weight in edges:
+		graph.add_edge(i, k, weight=weight)
+	graph.sourceNode = source
+	return graph
+
+def startSimulation(graph, schedule=bellmanFord.SYNCHRONOUS, algebra="(N, min, +)"):
+	model = simulationModule.SimulationModel()
+	model.enterInactiveState()
+	model.enterSimulationState(findAlgebra(algebra), False, graph, schedule=schedule)
+	while model.isComputing():
+		time.sleep(0.01)
+	return model
+
+@pytest.mark.parametrize("schedule", SCHEDULES)
+def testNegativeEdgesAreNotCheckedAgainstDijkstra(schedule):
+	model = startSimulation(createGraph(3, [(1, 0, 1), (2, 0, 5), (1, 2, -10)]), schedule)
+	assert model.hasConverged()
+	assert model.getError() is None
+	model.moveToEnd()
+	assert not model.isAtFixedPoint()
+	assert model.getCurrentState() == {0 : 0, 1 : -5, 2 : 5}
+	model.enterInactiveState()
+
+def testMoveToFixedPointBeforeConvergence(monkeypatch):
+	monkeypatch.setattr(simulationModule, "LOOKAHEAD", 5)
+	n = 50
+	model = startSimulation(createGraph(n, [(i, i - 1, 1) for i in range(1, n)]))
+	assert not model.hasConverged()
+	assert model.canMoveToEnd()
+	model.moveToEnd()
+	assert model.isAtFixedPoint()
+	assert model.getCurrentState() == {i : i for i in range(n)}
+	assert not model.canMoveToEnd() and not model.canMoveForward()
+	model.moveBack()
+	assert not model.isAtFixedPoint()
+	assert model.currentTime == 0
+	model.enterInactiveState()
+
+def testEngineDependsOnDensity():
+	n = 100
+	sparse = startSimulation(createGraph(n, [(i, i - 1, 1) for i in range(1, n)]))
+	dense = startSimulation(createGraph(20, [(i, k, 1 + (i * k) % 3) for i in range(20) for k in range(20) if i != k]))
+	assert not sparse.isNumeric
+	assert dense.isNumeric == simulationModule.numericBellmanFord.isApplicable(findAlgebra("(N, min, +)"))
+	assert sparse.getCurrentState() == {i : 0 if i == 0 else float("inf") for i in range(n)}
+	sparse.moveToEnd()
+	assert sparse.getCurrentState() == {i : i for i in range(n)}
+	sparse.enterInactiveState()
+	dense.enterInactiveState()
+
+@pytest.mark.parametrize("schedule", SCHEDULES)
+def testLastChangeTimes(schedule):
+	n = 6
+	edges = [(i, k, 1 + (3 * i + k) % 4) for i in range(n) for k in range(n) if i != k and (i + 2 * k) % 3 != 0]
+	model = startSimulation(createGraph(n, edges, source=2), schedule)
+	assert model.hasConverged()
+	states = [model.computation[t] for t in range(len(model.computation))]
+	for j in range(n):
+		expected = [max((t for t in range(1, len(states)) if states[t][i][j] != states[t - 1][i][j]), default=0) for i in range(n)]
+		assert model.getLastChangeTimes(j) == expected
+		assert model.getDestinationConvergenceTimes()[j] == max(expected)
+	model.enterInactiveState()
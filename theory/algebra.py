@@ -1,12 +1,45 @@
+import random
+
+from theory.paths import emptyPath
+
+# Appended to the name of an algebra by DisplayAlgebra.trackPaths
+PATHS_SUFFIX = " + paths"
+
+# The number of distinct routes a hash-consed algebra keeps. Beyond this the
+# table is emptied, and routes computed afterwards are just no longer shared
+# with earlier ones.
+INTERN_LIMIT = 2**16
+
+def _typeKey(v):
+	if type(v) is tuple:
+		return tuple(map(_typeKey, v))
+	return type(v)
+
+# A dictionary key for a route that, unlike the route itself, tells apart
+# equal values of different types such as 1, 1.0 and True
+def routeKey(v):
+	return (_typeKey(v), v)
+
 class Algebra():
 
-	def __init__(self, plus, times, invalidRoute, identityRoute, invalidEdge):
+	def __init__(self, plus, times, invalidRoute, identityRoute, invalidEdge, numericSemiring=None, increasing=False, labelIndependent=False):
 		self.plus 			= plus
 		self.times 			= times
 		self.invalidRoute 	= invalidRoute
 		self.identityRoute 	= identityRoute
 		self.invalidEdge 	= invalidEdge
 
+		# Names of the plus and times operations, e.g. ("min", "+"), if the
+		# algebra is a semiring over the extended reals and so can be vectorised
+		self.numericSemiring = numericSemiring
+
+		# Whether plus is selective and extending a route never improves it
+		self.increasing = increasing
+
+		# Whether the operations ignore the node ids, so that relabelling the
+		# nodes of a graph doesn't change how the computation behaves
+		self.labelIndependent = labelIndependent
+
 	@staticmethod
 	def lexicographicProduct(A, B):
 
@@ -33,15 +66,45 @@ class Algebra():
 			times 			= lexTimes,
 			invalidRoute 	= (A.invalidRoute, B.invalidRoute), 
 			identityRoute 	= (A.identityRoute, B.identityRoute), 
-			invalidEdge 	= (A.invalidEdge, B.invalidEdge)
+			invalidEdge 	= (A.invalidEdge, B.invalidEdge),
+			increasing		= A.increasing and B.increasing,
+			labelIndependent = A.labelIndependent and B.labelIndependent
 		)
 
 
+	# Interns the routes produced by the algebra, so that equal routes are
+	# usually the same object. States can then mostly be compared by identity
+	# and equal routes are only stored once. The table is dropped along with
+	# the algebra.
+	@staticmethod
+	def hashConsed(A):
+		routes = {}
+
+		def intern(v):
+			key = routeKey(v)
+			route = routes.get(key)
+			if route is None:
+				if len(routes) >= INTERN_LIMIT:
+					routes.clear()
+				route = routes[key] = v
+			return route
+
+		return Algebra(
+			plus 			= lambda x, y : intern(A.plus(x, y)),
+			times 			= lambda e, v, i, j : intern(A.times(e, v, i, j)),
+			invalidRoute 	= intern(A.invalidRoute),
+			identityRoute 	= intern(A.identityRoute),
+			invalidEdge 	= A.invalidEdge,
+			numericSemiring	= A.numericSemiring,
+			increasing		= A.increasing,
+			labelIndependent = A.labelIndependent
+		)
+
 	@staticmethod
 	def trackPaths(A):
 
 		invalidRoute  = None
-		identityRoute = (A.identityRoute, [])
+		identityRoute = (A.identityRoute, emptyPath)
 		invalidEdge   = A.invalidEdge
 
 		def pathsAdd(v,w):
@@ -85,21 +148,24 @@ class Algebra():
 			if y == A.invalidRoute:
 				return invalidRoute
 
-			q = [i] + p if p != [] else [i,j]
+			q = p.extend(i) if p else emptyPath.extend(j).extend(i)
 			return (y,q)
 
+		# Ties between paths are broken using the node ids, so the result is
+		# never label independent
 		return Algebra(
 			plus 			= pathsAdd,
 			times 			= pathsTimes,
 			invalidRoute 	= invalidRoute,
 			identityRoute 	= identityRoute,
-			invalidEdge 	= invalidEdge
+			invalidEdge 	= invalidEdge,
+			increasing		= A.increasing
 		)
 
 class DisplayAlgebra(Algebra):
 
-	def __init__(self, name, plus, times, invalidRoute, identityRoute, invalidEdge, defaultEdge, randomEdge, validateEdgeString, parseEdgeString, componentAlgebras):
-		Algebra.__init__(self, plus, times, invalidRoute, identityRoute, invalidEdge)
+	def __init__(self, name, plus, times, invalidRoute, identityRoute, invalidEdge, defaultEdge, randomEdge, validateEdgeString, parseEdgeString, componentAlgebras, numericSemiring=None, increasing=False, labelIndependent=False):
+		Algebra.__init__(self, plus, times, invalidRoute, identityRoute, invalidEdge, numericSemiring, increasing, labelIndependent)
 		self.name         	 	= name
 		self.defaultEdge  	 	= defaultEdge
 		self.validateEdgeString	= validateEdgeString
@@ -110,6 +176,15 @@ class DisplayAlgebra(Algebra):
 	def __repr__(self):
 		return self.name
 
+	# The operations are often lambdas, so algebras from the registry of
+	# example algebras are pickled by name and looked up again when unpickled.
+	# Any other algebra is pickled as usual.
+	def __reduce_ex__(self, protocol):
+		from theory.algebraExamples import findAlgebra, isRegistered
+		if isRegistered(self):
+			return (findAlgebra, (self.name,))
+		return Algebra.__reduce_ex__(self, protocol)
+
 	@staticmethod
 	def lexicographicProduct(A, B):
 		base = Algebra.lexicographicProduct(A, B)
@@ -122,25 +197,27 @@ class DisplayAlgebra(Algebra):
 			identityRoute       = base.identityRoute,
 			invalidEdge         = base.invalidEdge,
 			defaultEdge			= [A.defaultEdge , B.defaultEdge],
-			randomEdge			= lambda : (A.randomEdge(), B.randomEdge()),
+			randomEdge			= lambda rng=random : (A.randomEdge(rng), B.randomEdge(rng)),
 			validateEdgeString	= lambda v : A.validateEdgeString(v[0]) and B.validateEdgeString(v[1]),
 			parseEdgeString		= lambda v : (A.parseEdgeString(v[0]), B.parseEdgeString(v[1])),
-			componentAlgebras	= [A, B]
+			componentAlgebras	= [A, B],
+			increasing			= base.increasing,
+			labelIndependent	= base.labelIndependent
 		)
 
 	@staticmethod
 	def trackPaths(A):
 		base = Algebra.trackPaths(A)
 
-		def randomEdge():
-			edge = A.randomEdge()
+		def randomEdge(rng=random):
+			edge = A.randomEdge(rng)
 			if edge == A.invalidEdge:
 				return base.invalidEdge
 			else:
 				return edge
 
 		return DisplayAlgebra(
-			name				= A.name + " + paths",
+			name				= A.name + PATHS_SUFFIX,
 			plus 				= base.plus,
 			times 				= base.times,
 			invalidRoute        = base.invalidRoute,
@@ -150,5 +227,6 @@ class DisplayAlgebra(Algebra):
 			randomEdge			= randomEdge,
 			validateEdgeString	= A.validateEdgeString,
 			parseEdgeString		= A.parseEdgeString,
-			componentAlgebras	= [A]
+			componentAlgebras	= [A],
+			increasing			= base.increasing
 		)
\ No newline at end of file
@@ -5,25 +5,72 @@ from theory.algebra import *
 from theory.pathalogicalAlgebra import pathalogicalAlgebra
 
 
-def ftimes(f, a, i, j):
-	for p in f.split(":"):
-		if p == "c":
+# Compiled form of an F-custom edge function string such as "0t3:i2:c".
+# Each leading "xty" tier maps the route x to y and the final tier is
+# applied to every other route. Strings are only ever parsed once, and equal
+# strings share the same compiled function.
+class EdgeFunction():
+
+	__slots__ = ["string", "tiers", "final", "value"]
+
+	def __init__(self, string):
+		self.string = string
+		self.tiers  = {}
+
+		parts = string.split(":")
+		for p in parts[:-1]:
+			x, y = p.split("t")
+			self.tiers.setdefault(int(x), int(y))
+
+		last = parts[-1]
+		self.final = last[0]
+		self.value = int(last[1:]) if len(last) > 1 else None
+
+	def __call__(self, a):
+		if a in self.tiers:
+			return self.tiers[a]
+		if self.final == "c":
 			return a
-		if p[0] == "i":
-			return a + int(p[1:])
-		if p[0] == "r":
-			if len(p) == 1:
-				return float("inf")
-			else:
-				return max(a, int(p[1:]))
-		if "t" in p:
-			i = p.index("t")
-			i1 = int(p[:i])
-			i2 = int(p[i+1:])
-			if a == i1:
-				return i2
-		
-	print("ERROR " + f + " " + str(a))
+		if self.final == "i":
+			return a + self.value
+		if self.value is None:
+			return float("inf")
+		return max(a, self.value)
+
+	def __eq__(self, other):
+		if isinstance(other, EdgeFunction):
+			return self.string == other.string
+		if isinstance(other, str):
+			return self.string == other
+		return NotImplemented
+
+	def __hash__(self):
+		return hash(self.string)
+
+	def __str__(self):
+		return self.string
+
+	def __repr__(self):
+		return self.string
+
+	def __reduce__(self):
+		return (compileEdgeFunction, (self.string,))
+
+_edgeFunctions = {}
+
+def compileEdgeFunction(f):
+	if isinstance(f, EdgeFunction):
+		return f
+	function = _edgeFunctions.get(f)
+	if function is None:
+		function = _edgeFunctions[f] = EdgeFunction(f)
+	return function
+
+# Edge weights loaded from older files are still plain strings
+def ftimes(f, a, i, j):
+	if not isinstance(f, EdgeFunction):
+		f = compileEdgeFunction(f)
+	return f(a)
 
 
 # Verification functions
@@ -52,23 +99,23 @@ def fVerify(f):
 
 	return False
 
-def fRandom():
+def fRandom(rng=random):
 
-	r = random.randrange(5)
+	r = rng.randrange(5)
 	
 	if r == 0:
-		return "c"
+		return compileEdgeFunction("c")
 	if r == 1:
-		return "i" + str(random.randrange(1,5))
+		return compileEdgeFunction("i" + str(rng.randrange(1,5)))
 	if r == 2:
-		r2 = random.randrange(2)
-		return str(r2) + "t" + str(random.randrange(r2+1,5)) + ":c"
-	return "r"
+		r2 = rng.randrange(2)
+		return compileEdgeFunction(str(r2) + "t" + str(rng.randrange(r2+1,5)) + ":c")
+	return compileEdgeFunction("r")
 
 ## Examples
 
-def intRandom():
-	r = random.randrange(20)
+def intRandom(rng=random):
+	r = rng.randrange(20)
 
 	if r < 10:
 		return r
@@ -106,7 +153,10 @@ minPlus = DisplayAlgebra(
 	randomEdge          = intRandom,
 	validateEdgeString 	= isInt,
 	parseEdgeString		= int,
-	componentAlgebras 	= []
+	componentAlgebras 	= [],
+	numericSemiring		= ("min", "+"),
+	increasing			= True,
+	labelIndependent	= True
 )
 
 maxMin = DisplayAlgebra(
@@ -120,7 +170,10 @@ maxMin = DisplayAlgebra(
 	randomEdge          = intRandom,
 	validateEdgeString 	= isInt,
 	parseEdgeString		= int,
-	componentAlgebras	= []
+	componentAlgebras	= [],
+	numericSemiring		= ("max", "min"),
+	increasing			= True,
+	labelIndependent	= True
 )
 
 shortestWidest = DisplayAlgebra.lexicographicProduct(maxMin, minPlus)
@@ -131,12 +184,13 @@ fRing = DisplayAlgebra(
 	times         		= ftimes,
 	invalidRoute  		= float("inf"),
 	identityRoute 		= 0,
-	invalidEdge   		= "r",
-	defaultEdge			= "c",
+	invalidEdge   		= compileEdgeFunction("r"),
+	defaultEdge			= compileEdgeFunction("c"),
 	randomEdge          = fRandom,
 	validateEdgeString 	= fVerify,
-	parseEdgeString		= lambda x : x,
-	componentAlgebras	= []
+	parseEdgeString		= compileEdgeFunction,
+	componentAlgebras	= [],
+	labelIndependent	= True
 )
 
 
@@ -146,4 +200,24 @@ examples = [
 	shortestWidest,
 	fRing,
 	pathalogicalAlgebra
-]
\ No newline at end of file
+]
+
+def findAlgebra(name):
+	for algebra in examples:
+		if algebra.name == name:
+			return algebra
+
+	if name.endswith(PATHS_SUFFIX):
+		return DisplayAlgebra.trackPaths(findAlgebra(name[:-len(PATHS_SUFFIX)]))
+
+	raise Exception("No algebra named " + name + " found")
+
+# Whether findAlgebra(algebra.name) rebuilds an equivalent algebra, i.e. it is
+# one of the examples or tracks the paths of one
+def isRegistered(algebra):
+	if any(algebra is example for example in examples):
+		return True
+
+	components = getattr(algebra, 'componentAlgebras', None)
+	return (algebra.name.endswith(PATHS_SUFFIX) and components is not None and len(components) == 1
+		and components[0].name + PATHS_SUFFIX == algebra.name and isRegistered(components[0]))
@@ -1,5 +1,10 @@
 
 import functools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import theory.cycles as cycles
 
 def createIdentityMatrix(algebra, size):
 	return [[algebra.identityRoute if i == j else algebra.invalidRoute 
@@ -12,6 +17,17 @@ def createAdjacencyMatrix(algebra, graph):
 				for j in range(size)] 
 					for i in range(size)]
 
+# For each node i the list of pairs (k, weight) for every edge from i to k,
+# i.e. the neighbours whose routes i extends. Ordered by k so that routes are
+# combined in the same order as in iterate.
+def createNeighbourLists(algebra, graph):
+	return [[(k, graph[i][k]['weight']) for k in sorted(graph[i])]
+				for i in range(len(graph))]
+
+def adjacencyMatrixToNeighbourLists(algebra, adM):
+	return [[(k, e) for k, e in enumerate(row) if e != algebra.invalidEdge]
+				for row in adM]
+
 def iterate(algebra, state, idM, adM):
 	n = len(state)
 	newState = [[0 for _ in range(n)] for _ in range(n)]
@@ -24,10 +40,251 @@ def iterate(algebra, state, idM, adM):
 	return newState
 
 def solve(algebra, state, idM, adM, limit=1000):
-	states = [state, iterate(algebra, state, idM, adM)]
-	while len(states) < limit and states[-1] != states[-2]:
-		states.append(iterate(algebra, states[-1], idM, adM))
-	return states
+	return solveDestinations(algebra, state, idM, adM, limit)[0]
+
+# As solve, but also returns for each destination j the first time at which
+# column j of the state stopped changing (or None if it was still changing
+# when the limit was reached)
+def solveDestinations(algebra, state, idM, adM, limit=1000):
+	neighbours = adjacencyMatrixToNeighbourLists(algebra, adM)
+	return sparseSolveDestinations(algebra, state, idM, neighbours, limit)
+
+# Equivalent to iterate/solve but only extends routes along actual edges, so
+# the cost of an iteration scales with the number of edges rather than n^3
+def sparseSolve(algebra, state, idM, neighbours, limit=1000):
+	return sparseSolveDestinations(algebra, state, idM, neighbours, limit)[0]
+
+# Column j of the next state only depends on column j of the current one, so
+# a column that doesn't change in one iteration never changes again. As the
+# incremental iteration only recomputes entries whose inputs changed, such
+# frozen columns are never revisited.
+def sparseSolveDestinations(algebra, state, idM, neighbours, limit=1000):
+	states, _, convergenceTimes = sparseSolveProfile(algebra, state, idM, neighbours, limit)
+	return states, convergenceTimes
+
+# Also returns for every node i and destination j the last time at which i's
+# route to j changed
+def sparseSolveProfile(algebra, state, idM, neighbours, limit=1000):
+	n = len(state)
+	dependents = createDependentLists(neighbours)
+	newState, changes = incrementalIterate(algebra, state, idM, neighbours, dependents)
+
+	states = [state, newState]
+	lastChanges = [[0 for _ in range(n)] for _ in range(n)]
+	while True:
+		for i, j in changes:
+			lastChanges[i][j] = len(states) - 1
+		if len(states) >= limit or not changes:
+			break
+		newState, changes = incrementalIterate(algebra, states[-1], idM, neighbours, dependents, changes)
+		states.append(newState)
+
+	return states, lastChanges, destinationConvergenceTimes(lastChanges, changes)
+
+# The time at which each column converged given the last time each entry
+# changed, where columns with entries in the latest changes haven't converged
+def destinationConvergenceTimes(lastChanges, changes):
+	unconverged = {j for _, j in changes}
+	return [None if j in unconverged else max((row[j] for row in lastChanges), default=0)
+				for j in range(len(lastChanges))]
+
+# The number of iterations before the state stops changing, i.e. the value of
+# len(solve(...)) - 2, computed while only keeping the current state. Returns
+# None if the computation hasn't converged within limit states or by the
+# deadline (a time.time() value).
+def convergenceTime(algebra, state, idM, adM, limit=1000, deadline=None):
+	return probeDestinations(algebra, state, idM, adM, limit, deadline)[0]
+
+# As convergenceTime, but also returns the time at which each destination
+# converged as solveDestinations does
+def probeDestinations(algebra, state, idM, adM, limit=1000, deadline=None):
+	neighbours = adjacencyMatrixToNeighbourLists(algebra, adM)
+	dependents = createDependentLists(neighbours)
+	lastChanges = [0 for _ in state]
+
+	state, changes = incrementalIterate(algebra, state, idM, neighbours, dependents)
+	count = 2
+	while changes:
+		for _, j in changes:
+			lastChanges[j] = count - 1
+		if count >= limit or (deadline is not None and time.time() > deadline):
+			unconverged = {j for _, j in changes}
+			return None, [None if j in unconverged else t for j, t in enumerate(lastChanges)]
+
+		state, changes = incrementalIterate(algebra, state, idM, neighbours, dependents, changes)
+		count += 1
+
+	return count - 2, lastChanges
+
+# As probeDestinations, but also stops as soon as a state recurs, returning
+# (prePeriod, period) in place of the convergence time: from state prePeriod
+# onwards the computation repeats every period states. A computation that
+# converges has period 1 and its convergence time as the pre-period. Returns
+# None in its place if no state recurs within limit states or by the
+# deadline. Only keeps a constant number of states (see theory/cycles.py).
+def probeCycle(algebra, state, idM, adM, limit=1000, deadline=None):
+	neighbours = adjacencyMatrixToNeighbourLists(algebra, adM)
+	dependents = createDependentLists(neighbours)
+	lastChanges = [0 for _ in state]
+
+	def step(walker):
+		return incrementalIterate(algebra, walker[0], idM, neighbours, dependents, walker[1])
+
+	def destinationTimes(changes):
+		unconverged = {j for _, j in changes}
+		return [None if j in unconverged else t for j, t in enumerate(lastChanges)]
+
+	start = (state, None)
+	detector = cycles.CycleDetector()
+	detector.add(state)
+
+	walker = step(start)
+	count = 2
+	while walker[1]:
+		for _, j in walker[1]:
+			lastChanges[j] = count - 1
+		if detector.add(walker[0]):
+			prePeriod = cycles.findPrePeriod(start, step, detector.period, lambda x, y : x[0] == y[0])
+			return (prePeriod, detector.period), destinationTimes(walker[1])
+		if count >= limit or (deadline is not None and time.time() > deadline):
+			return None, destinationTimes(walker[1])
+
+		walker = step(walker)
+		count += 1
+
+	return (count - 2, 1), lastChanges
+
+def findCycle(algebra, state, idM, adM, limit=1000, deadline=None):
+	return probeCycle(algebra, state, idM, adM, limit, deadline)[0]
+
+# For each node k the nodes i that extend k's routes
+def createDependentLists(neighbours):
+	dependents = [[] for _ in neighbours]
+	for i, edges in enumerate(neighbours):
+		for k, _ in edges:
+			dependents[k].append(i)
+	return dependents
+
+# Entry (i,j) can only change if the entry (k,j) of one of i's neighbours k
+# changed in the previous iteration, so only those entries are recomputed.
+# Returns the new state together with the set of entries that changed, which
+# is empty exactly when the computation has converged. Passing no changes
+# recomputes every entry. Rows without any changes are shared with the
+# previous state.
+def incrementalIterate(algebra, state, idM, neighbours, dependents, changes=None):
+	n = len(state)
+	if changes is None:
+		dirty = [(i, j) for i in range(n) for j in range(n)]
+	else:
+		dirty = {(i, j) for k, j in changes for i in dependents[k]}
+
+	newState = list(state)
+	newChanges = set()
+
+	for i, j in dirty:
+		candidateRoutes = [algebra.times(e, state[k][j], i, k) for k, e in neighbours[i]] + [idM[i][j]]
+		route = functools.reduce(algebra.plus, candidateRoutes)
+
+		if route is not state[i][j] and route != state[i][j]:
+			if newState[i] is state[i]:
+				newState[i] = list(state[i])
+			newState[i][j] = route
+			newChanges.add((i, j))
+
+	return newState, newChanges
+
+###############
+## Schedules
+
+# In the synchronous schedule every node updates its routes from the same
+# state. In the asynchronous schedules nodes are activated one at a time and
+# update their routes in place, so nodes activated later see the routes just
+# chosen by earlier ones. One step of the Gauss-Seidel schedule activates
+# every node in the given order, while one step of the round-robin schedule
+# activates a single node, cycling through the order.
+
+SYNCHRONOUS 	= "Synchronous"
+GAUSS_SEIDEL 	= "Gauss-Seidel"
+ROUND_ROBIN 	= "Round-robin"
+
+SCHEDULES = [SYNCHRONOUS, GAUSS_SEIDEL, ROUND_ROBIN]
+
+def createNodeOrder(size, order=None):
+	if order is None:
+		return list(range(size))
+	if sorted(order) != list(range(size)):
+		raise Exception("The node order must contain every node from 0 to " + str(size - 1) + " exactly once")
+	return list(order)
+
+# The number of steps of the schedule in which every node is activated
+def sweepLength(schedule, size):
+	return max(size, 1) if schedule == ROUND_ROBIN else 1
+
+# Recomputes node i's routes from the current state, replacing its row of
+# the state if any of them changed. Returns the destinations that changed.
+def activateNode(algebra, state, idM, neighbours, i):
+	row = state[i]
+	newRow = None
+	changed = []
+
+	for j in range(len(state)):
+		candidateRoutes = [algebra.times(e, state[k][j], i, k) for k, e in neighbours[i]] + [idM[i][j]]
+		route = functools.reduce(algebra.plus, candidateRoutes)
+
+		if route is not row[j] and route != row[j]:
+			if newRow is None:
+				newRow = list(row)
+			newRow[j] = route
+			changed.append(j)
+
+	if newRow is not None:
+		state[i] = newRow
+	return changed
+
+def gaussSeidelIterate(algebra, state, idM, neighbours, order):
+	newState = list(state)
+	changes = set()
+	for i in order:
+		changes.update((i, j) for j in activateNode(algebra, newState, idM, neighbours, i))
+	return newState, changes
+
+def roundRobinIterate(algebra, state, idM, neighbours, node):
+	newState = list(state)
+	return newState, {(node, j) for j in activateNode(algebra, newState, idM, neighbours, node)}
+
+# Returns a function taking a state, the changes made by the previous step
+# and the time of the state, and returning the next state under the schedule
+# together with the entries that changed
+def createScheduleStep(algebra, idM, neighbours, schedule, order=None):
+	order = createNodeOrder(len(idM), order)
+	if schedule == SYNCHRONOUS:
+		dependents = createDependentLists(neighbours)
+		return lambda state, changes, time : incrementalIterate(algebra, state, idM, neighbours, dependents, changes)
+	if schedule == GAUSS_SEIDEL or (schedule == ROUND_ROBIN and not order):
+		return lambda state, changes, time : gaussSeidelIterate(algebra, state, idM, neighbours, order)
+	if schedule == ROUND_ROBIN:
+		return lambda state, changes, time : roundRobinIterate(algebra, state, idM, neighbours, order[time % len(order)])
+	raise Exception("Unknown schedule " + str(schedule))
+
+# Runs the computation under the given schedule while only keeping the
+# current state. Under an asynchronous schedule the state has converged once
+# a whole sweep of activations changes nothing. Returns the final state and
+# the number of steps before it stopped changing, or None if it hasn't
+# converged within limit states.
+def scheduledSolve(algebra, state, idM, adM, schedule, order=None, limit=1000):
+	neighbours = adjacencyMatrixToNeighbourLists(algebra, adM)
+	step = createScheduleStep(algebra, idM, neighbours, schedule, order)
+	sweep = sweepLength(schedule, len(state))
+
+	changes = None
+	lastChange = 0
+	for time in range(limit - 1):
+		state, changes = step(state, changes, time)
+		if changes:
+			lastChange = time + 1
+		elif time + 1 - lastChange >= sweep:
+			return state, lastChange
+	return state, None
 
 
 
@@ -48,4 +305,33 @@ def singleSolve(algebra, state, idM, adM, limit=1000):
 	states = [state, singleIterate(algebra, state, idM, adM)]
 	while len(states) < limit and states[-1] != states[-2]:
 		states.append(singleIterate(algebra, states[-1], idM, adM))
-	return states
\ No newline at end of file
+	return states
+
+# Solves each destination column independently across a pool of processes
+# and stitches the per-column traces back together. A column that has
+# converged stays constant, so shorter traces are padded with their final
+# state. The algebra must be picklable (see DisplayAlgebra.__reduce__).
+
+def _solveColumns(algebra, state, idM, adM, columns, limit):
+	n = len(state)
+	traces = []
+	for j in columns:
+		column = [state[i][j] for i in range(n)]
+		idColumn = [[idM[i][j]] for i in range(n)]
+		traces.append(singleSolve(algebra, column, idColumn, adM, limit))
+	return traces
+
+def parallelSolve(algebra, state, idM, adM, limit=1000, workers=None):
+	n = len(state)
+	workers = workers or os.cpu_count() or 1
+	chunkSize = max(1, n // (4*workers))
+	chunks = [range(j, min(n, j + chunkSize)) for j in range(0, n, chunkSize)]
+
+	with ProcessPoolExecutor(workers) as executor:
+		futures = [executor.submit(_solveColumns, algebra, state, idM, adM, columns, limit) for columns in chunks]
+		traces = [trace for future in futures for trace in future.result()]
+
+	length = max(len(trace) for trace in traces) if traces else 2
+	return [[[traces[j][min(t, len(traces[j]) - 1)][i] for j in range(n)]
+				for i in range(n)]
+					for t in range(length)]
@@ -0,0 +1,56 @@
+# Brent's cycle detection for deterministic sequences of states, such as the
+# states of a Bellman-Ford computation. Only a single earlier state is kept,
+# and states are compared by their fingerprints (hashes) before being
+# compared in full. A sequence that converges has a cycle of period 1.
+
+def stateFingerprint(state):
+	return hash(tuple(map(tuple, state)))
+
+# Fed the states of a sequence one at a time, spots the first time a state
+# recurs. At that point period holds the length of the cycle.
+class CycleDetector():
+
+	def __init__(self, fingerprint=stateFingerprint, same=None):
+		self.period = None
+
+		self._fingerprint 	= fingerprint
+		self._same 			= same or (lambda x, y : x == y)
+		self._power 		= 1
+		self._length 		= 0
+		self._tortoise 		= None
+		self._tortoiseKey 	= None
+
+	# Returns whether a cycle has been found
+	def add(self, state):
+		if self.period is not None:
+			return True
+
+		key = self._fingerprint(state)
+		if self._tortoiseKey is not None:
+			self._length += 1
+			if key == self._tortoiseKey and self._same(state, self._tortoise):
+				self.period = self._length
+				return True
+			if self._length < self._power:
+				return False
+			self._power *= 2
+
+		self._tortoise 	  = state
+		self._tortoiseKey = key
+		self._length 	  = 0
+		return False
+
+# The index of the first state that recurs, given the period of the cycle.
+# Walks two copies of the sequence from the start, one period apart.
+def findPrePeriod(start, step, period, same=None):
+	same = same or (lambda x, y : x == y)
+
+	tortoise = hare = start
+	for _ in range(period):
+		hare = step(hare)
+
+	prePeriod = 0
+	while not same(tortoise, hare):
+		tortoise, hare = step(tortoise), step(hare)
+		prePeriod += 1
+	return prePeriod
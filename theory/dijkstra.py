@@ -0,0 +1,74 @@
+import functools
+import heapq
+
+# Generalised Dijkstra for algebras whose plus is selective and whose times
+# is increasing (extending a route never makes it better). For such algebras
+# the routes to a destination can be fixed in order of preference, giving the
+# final state of the Bellman-Ford computation in O(m log n) per destination.
+
+# An algebra is only increasing over edges that don't improve on the identity
+# route, e.g. non-negative weights under (N, min, +), so when the neighbour
+# lists are given the edges of the graph are checked as well
+def isApplicable(algebra, neighbours=None):
+	if not algebra.increasing:
+		return False
+	if neighbours is None:
+		return True
+	identityRoute = algebra.identityRoute
+	for i, edges in enumerate(neighbours):
+		for k, e in edges:
+			if algebra.plus(identityRoute, algebra.times(e, identityRoute, i, k)) != identityRoute:
+				return False
+	return True
+
+# Orders routes by preference using only the algebra's plus
+def createRouteKey(algebra):
+
+	def compare(x, y):
+		if x == y:
+			return 0
+		if algebra.plus(x, y) == x:
+			return -1
+		return 1
+
+	return functools.cmp_to_key(compare)
+
+# For each node k the pairs (i, weight) for every edge from i to k
+def createDependentEdgeLists(neighbours):
+	dependents = [[] for _ in neighbours]
+	for i, edges in enumerate(neighbours):
+		for k, e in edges:
+			dependents[k].append((i, e))
+	return dependents
+
+def solveDestination(algebra, idM, dependents, j, key):
+	n = len(idM)
+	routes = [idM[i][j] for i in range(n)]
+	fixed = [False for _ in range(n)]
+
+	queue = [(key(routes[i]), i) for i in range(n) if routes[i] != algebra.invalidRoute]
+	heapq.heapify(queue)
+
+	while queue:
+		_, k = heapq.heappop(queue)
+		if fixed[k]:
+			continue
+		fixed[k] = True
+
+		for i, e in dependents[k]:
+			if not fixed[i]:
+				route = algebra.plus(routes[i], algebra.times(e, routes[k], i, k))
+				if route != routes[i]:
+					routes[i] = route
+					heapq.heappush(queue, (key(route), i))
+
+	return routes
+
+# Returns the fixed point reached by bellmanFord.solve from the identity state
+def solve(algebra, idM, neighbours):
+	n = len(idM)
+	key = createRouteKey(algebra)
+	dependents = createDependentEdgeLists(neighbours)
+
+	columns = [solveDestination(algebra, idM, dependents, j, key) for j in range(n)]
+	return [[columns[j][i] for j in range(n)] for i in range(n)]
@@ -0,0 +1,117 @@
+import functools
+import heapq
+import random
+
+# A discrete-event simulation of an asynchronous path-vector protocol. Each
+# node keeps the latest route to each destination advertised by each of its
+# neighbours. Whenever a route arrives the node recomputes its own route to
+# that destination, and if it changed sends it to every node that extends
+# its routes. A message along the edge from i to k (over which i extends k's
+# routes) takes the delay of that edge to arrive. Delays are either given
+# for each edge or drawn at random from a seed the first time an edge is
+# used, with edges that have neither taking DEFAULT_DELAY.
+#
+# Only messages that are actually sent are ever processed and only the
+# destinations asked for are simulated, so the cost scales with the number
+# of messages rather than with the size of the graph. Pending messages are
+# kept in a heap ordered by arrival time, with messages arriving at the same
+# time delivered in the order they were sent.
+
+ASYNCHRONOUS = "Asynchronous"
+
+DEFAULT_DELAY = 1.0
+
+MIN_RANDOM_DELAY = 0.5
+MAX_RANDOM_DELAY = 1.5
+
+def _sameRoute(route1, route2):
+	return route1 is route2 or route1 == route2
+
+class EventSimulator():
+
+	def __init__(self, algebra, neighbours, delays=None, seed=None, destinations=None):
+		self.algebra 		= algebra
+		self.neighbours 	= neighbours
+		self.destinations 	= list(range(len(neighbours))) if destinations is None else list(destinations)
+		self.time 			= 0.0
+		self.messages 		= 0
+
+		self._delays 	= dict(delays or {})
+		self._random 	= None if seed is None else random.Random(seed)
+		self._queue 	= []
+		self._sent 		= 0
+		self._routes 	= {}
+		self._received 	= {}
+
+		self._dependents = [[] for _ in neighbours]
+		for i, edges in enumerate(neighbours):
+			for k, _ in edges:
+				self._dependents[k].append(i)
+
+		for delay in self._delays.values():
+			if delay <= 0:
+				raise Exception("Link delays must be positive")
+
+		# Every destination starts by advertising its identity route
+		for j in self.destinations:
+			self._routes[(j, j)] = algebra.identityRoute
+			self._send(j, j, algebra.identityRoute)
+
+	# The route from node i to destination j
+	def getRoute(self, i, j):
+		return self._routes.get((i, j), self._initialRoute(i, j))
+
+	def hasConverged(self):
+		return not self._queue
+
+	# Delivers the messages arriving at the next time at which some route
+	# changes. Returns the list of (node, destination, route) that changed,
+	# or None if there are no messages left to deliver.
+	def step(self):
+		while self._queue:
+			self.time = self._queue[0][0]
+
+			# The routes before this time, as a route may change more than once
+			previousRoutes = {}
+			while self._queue and self._queue[0][0] == self.time:
+				_, _, sender, receiver, destination, route = heapq.heappop(self._queue)
+				self.messages += 1
+				previousRoutes.setdefault((receiver, destination), self.getRoute(receiver, destination))
+				self._receive(sender, receiver, destination, route)
+
+			changes = [(i, j, self.getRoute(i, j)) for (i, j), route in previousRoutes.items()
+						if not _sameRoute(self.getRoute(i, j), route)]
+			if changes:
+				return changes
+		return None
+
+	#############
+	## Internal
+
+	def _initialRoute(self, i, j):
+		return self.algebra.identityRoute if i == j else self.algebra.invalidRoute
+
+	def _delay(self, i, k):
+		if (i, k) not in self._delays:
+			if self._random is None:
+				return DEFAULT_DELAY
+			self._delays[(i, k)] = self._random.uniform(MIN_RANDOM_DELAY, MAX_RANDOM_DELAY)
+		return self._delays[(i, k)]
+
+	def _send(self, k, j, route):
+		for i in self._dependents[k]:
+			heapq.heappush(self._queue, (self.time + self._delay(i, k), self._sent, k, i, j, route))
+			self._sent += 1
+
+	# Records the route advertised by node k, and if i's route to j changes as
+	# a result advertises the new one
+	def _receive(self, k, i, j, route):
+		self._received[(i, k, j)] = route
+
+		invalid = self.algebra.invalidRoute
+		candidateRoutes = [self.algebra.times(e, self._received.get((i, l, j), invalid), i, l) for l, e in self.neighbours[i]] + [self._initialRoute(i, j)]
+		newRoute = functools.reduce(self.algebra.plus, candidateRoutes)
+
+		if not _sameRoute(newRoute, self.getRoute(i, j)):
+			self._routes[(i, j)] = newRoute
+			self._send(i, j, newRoute)
@@ -0,0 +1,95 @@
+import collections
+
+# A bounded memory store for the states of a long computation. Every
+# interval-th state is kept as a keyframe and a limited number of the other
+# states are cached. Any state that has been evicted is recomputed on demand
+# by stepping forwards from the nearest earlier keyframe, which also caches
+# the rest of that segment so that neighbouring states are immediately
+# available. If the keyframes alone come to fill half of the budget, the
+# interval is doubled and every other keyframe dropped.
+#
+# The step function is given a state, the changes returned by the previous
+# step (None for the first step from a keyframe) and the time of the state,
+# and must return the next state and its changes, as the functions made by
+# bellmanFord.createScheduleStep do.
+
+KEYFRAME_INTERVAL = 16
+
+class CheckpointedHistory():
+
+	def __init__(self, step, budget, interval=KEYFRAME_INTERVAL):
+		self.budget 	= max(budget, 4)
+		self.interval 	= max(min(interval, self.budget // 2), 1)
+
+		self._step 		= step
+		self._keyframes = {}
+		self._cache 	= collections.OrderedDict()
+		self._count 	= 0
+		self._last 		= None
+
+	def append(self, state):
+		time = self._count
+		self._count += 1
+		self._last = state
+
+		if time % self.interval == 0:
+			self._keyframes[time] = state
+			if len(self._keyframes) > self.budget // 2:
+				self._thinKeyframes()
+		else:
+			self._cacheState(time, state)
+
+	def __len__(self):
+		return self._count
+
+	def __getitem__(self, time):
+		if time < 0:
+			time += self._count
+		if not 0 <= time < self._count:
+			raise IndexError("history index out of range")
+
+		if time == self._count - 1:
+			return self._last
+		if time in self._keyframes:
+			return self._keyframes[time]
+		if time not in self._cache:
+			self._recomputeSegment(time)
+		else:
+			self._cache.move_to_end(time)
+		return self._cache[time]
+
+	# Ensures that the states either side of the given time are available
+	# without recomputation
+	def prefetch(self, time):
+		for t in (time - 1, time + 1):
+			if 0 <= t < self._count:
+				self[t]
+
+	#############
+	## Internal
+
+	def _cacheState(self, time, state):
+		self._cache[time] = state
+		self._cache.move_to_end(time)
+		while self._cache and len(self._cache) > self.budget - len(self._keyframes):
+			self._cache.popitem(last=False)
+
+	def _thinKeyframes(self):
+		self.interval *= 2
+		for time in list(self._keyframes):
+			if time % self.interval != 0:
+				self._cacheState(time, self._keyframes.pop(time))
+
+	# Steps forwards from the keyframe before the given time, caching as many
+	# of the states around it as the budget allows
+	def _recomputeSegment(self, time):
+		start = time - time % self.interval
+		end = min(start + self.interval, self._count - 1)
+		width = max((self.budget - len(self._keyframes)) // 2, 1)
+
+		state, changes = self._keyframes[start], None
+		for t in range(start + 1, min(end, time + width + 1)):
+			state, changes = self._step(state, changes, t - 1)
+			if t > time - width:
+				self._cacheState(t, state)
+		self._cache.move_to_end(time)
@@ -0,0 +1,131 @@
+import math
+import random
+
+import theory.bellmanFord as bellmanFord
+import theory.randomSearch as randomSearch
+
+# Local search strategies for finding routing problems that take a long time
+# to converge, using the convergence time as the fitness of an instance. Each
+# strategy is a generator that is given the algebra, the size of the graph,
+# the number of solves it may use and optionally a function that scores a list
+# of adjacency matrices. After each round of solves it yields
+# (runs, bestScore, adM) where adM is the new best instance if it has just
+# improved and None otherwise. All randomness comes from the random number
+# generator rng (a random.Random), so seeding it makes a search reproducible.
+
+HILL_CLIMBING_NEIGHBOURS = 20
+
+ANNEALING_START_TEMPERATURE = 2.0
+ANNEALING_END_TEMPERATURE 	= 0.05
+
+POPULATION_SIZE = 50
+TOURNAMENT_SIZE = 3
+
+def _scorer(algebra, size, calculateScores):
+	if calculateScores is not None:
+		return calculateScores
+	idM = bellmanFord.createIdentityMatrix(algebra, size)
+	return lambda adMs : randomSearch.calculateScores(algebra, idM, adMs)
+
+# Replaces the weight of a single random edge
+def mutate(algebra, adM, rng=random):
+	result = [row[:] for row in adM]
+	if len(adM) > 1:
+		i, j = rng.sample(range(len(adM)), 2)
+		result[i][j] = algebra.randomEdge(rng)
+	return result
+
+def hillClimbing(algebra, size, totalRuns, calculateScores=None, rng=None):
+	calculateScores = _scorer(algebra, size, calculateScores)
+	rng = rng or random.Random()
+
+	current = randomSearch.createRandomAdjacencyMatrix(algebra, size, rng)
+	currentScore, = calculateScores([current])
+	runs = 1
+	yield runs, currentScore, current
+
+	while runs < totalRuns:
+		candidates = [mutate(algebra, current, rng) for _ in range(min(HILL_CLIMBING_NEIGHBOURS, totalRuns - runs))]
+		scores = calculateScores(candidates)
+		runs += len(candidates)
+
+		# Sideways moves let the search drift across plateaus
+		best = max(range(len(candidates)), key=scores.__getitem__)
+		improved = scores[best] > currentScore
+		if scores[best] >= currentScore:
+			current, currentScore = candidates[best], scores[best]
+		yield runs, currentScore, current if improved else None
+
+def simulatedAnnealing(algebra, size, totalRuns, calculateScores=None, rng=None):
+	calculateScores = _scorer(algebra, size, calculateScores)
+	rng = rng or random.Random()
+
+	current = randomSearch.createRandomAdjacencyMatrix(algebra, size, rng)
+	currentScore, = calculateScores([current])
+	bestScore = currentScore
+	yield 1, bestScore, current
+
+	for runs in range(2, totalRuns + 1):
+		temperature = ANNEALING_START_TEMPERATURE * (ANNEALING_END_TEMPERATURE/ANNEALING_START_TEMPERATURE) ** (runs/totalRuns)
+
+		candidate = mutate(algebra, current, rng)
+		score, = calculateScores([candidate])
+		if score >= currentScore or rng.random() < math.exp((score - currentScore)/temperature):
+			current, currentScore = candidate, score
+
+		improved = currentScore > bestScore
+		if improved:
+			bestScore = currentScore
+		yield runs, bestScore, current if improved else None
+
+# Uniform crossover of the rows of the two parents
+def crossover(adM1, adM2, rng=random):
+	return [rng.choice((row1, row2))[:] for row1, row2 in zip(adM1, adM2)]
+
+def geneticAlgorithm(algebra, size, totalRuns, calculateScores=None, rng=None):
+	calculateScores = _scorer(algebra, size, calculateScores)
+	rng = rng or random.Random()
+
+	population = [randomSearch.createRandomAdjacencyMatrix(algebra, size, rng) for _ in range(min(POPULATION_SIZE, totalRuns))]
+	scores = calculateScores(population)
+	runs = len(population)
+
+	best = max(range(len(population)), key=scores.__getitem__)
+	bestScore = scores[best]
+	yield runs, bestScore, population[best]
+
+	def select():
+		contestants = rng.sample(range(len(population)), min(TOURNAMENT_SIZE, len(population)))
+		return population[max(contestants, key=scores.__getitem__)]
+
+	while runs < totalRuns:
+		children = [mutate(algebra, crossover(select(), select(), rng), rng) for _ in range(min(POPULATION_SIZE, totalRuns - runs))]
+		childScores = calculateScores(children)
+		runs += len(children)
+
+		# The fittest of the parents and children survive
+		ranked = sorted(zip(scores + childScores, population + children), key=lambda x: x[0], reverse=True)[:POPULATION_SIZE]
+		scores = [score for score, _ in ranked]
+		population = [adM for _, adM in ranked]
+
+		improved = scores[0] > bestScore
+		if improved:
+			bestScore = scores[0]
+		yield runs, bestScore, population[0] if improved else None
+
+strategies = {
+	"Hill climbing" 		: hillClimbing,
+	"Simulated annealing" 	: simulatedAnnealing,
+	"Genetic algorithm" 	: geneticAlgorithm
+}
+
+# Reruns a strategy from the seed it was given as random.Random(seed) and
+# returns the best instance it had found after the given number of solves
+def regenerateInstance(strategy, algebra, size, totalRuns, seed, runs, calculateScores=None):
+	best = None
+	for solves, _, adM in strategies[strategy](algebra, size, totalRuns, calculateScores, random.Random(seed)):
+		if adM is not None:
+			best = adM
+		if solves >= runs:
+			break
+	return best
@@ -0,0 +1,52 @@
+# Delta debugging minimisation (Zeller's ddmin). Given a list of items for
+# which a test passes, finds a subset for which it still passes such that
+# removing any single further item makes it fail, while testing whole groups
+# of items at a time. The test is given a list of candidate subsets and
+# returns whether it passes for each, so that the candidates of a round can
+# be evaluated together.
+
+def _split(items, n):
+	size, extra = divmod(len(items), n)
+	chunks = []
+	start = 0
+	for k in range(n):
+		end = start + size + (1 if k < extra else 0)
+		chunks.append(items[start:end])
+		start = end
+	return chunks
+
+def _firstPassing(candidates, test):
+	for candidate, passed in zip(candidates, test(candidates)):
+		if passed:
+			return candidate
+	return None
+
+def ddmin(items, test):
+	items = list(items)
+	if not items:
+		return items
+
+	# Everything may be removable
+	if test([[]])[0]:
+		return []
+
+	n = 2
+	while len(items) >= 2:
+		chunks = _split(items, n)
+
+		subset = _firstPassing(chunks, test)
+		if subset is not None:
+			items, n = subset, 2
+			continue
+
+		complements = [[item for chunk in chunks if chunk is not other for item in chunk] for other in chunks]
+		complement = _firstPassing(complements, test) if n > 2 else None
+		if complement is not None:
+			items, n = complement, max(n - 1, 2)
+			continue
+
+		if n >= len(items):
+			break
+		n = min(len(items), 2*n)
+
+	return items
@@ -0,0 +1,217 @@
+import time
+
+import theory.cycles as cycles
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+# Maximum number of entries in the temporary array built by a single
+# broadcasted product (bounds memory use on large graphs)
+BLOCK_ENTRIES = 2**22
+
+_plusOperations  = {"min" : "minimum", "max" : "maximum"}
+_timesOperations = {"+" : "add", "min" : "minimum", "max" : "maximum"}
+
+def isApplicable(algebra):
+	if numpy is None or algebra.numericSemiring is None:
+		return False
+	plusName, timesName = algebra.numericSemiring
+	return plusName in _plusOperations and timesName in _timesOperations
+
+###############
+## Conversion
+
+def toArray(algebra, matrix):
+	return numpy.array(
+		[[algebra.invalidEdge if v is None else v for v in row] for row in matrix],
+		dtype=float
+	)
+
+def _toValue(v):
+	return int(v) if v.is_integer() else v
+
+def toMatrix(array):
+	return [[_toValue(v) for v in row] for row in array.tolist()]
+
+#############
+## Solving
+
+def _operations(algebra):
+	plusName, timesName = algebra.numericSemiring
+	return getattr(numpy, _plusOperations[plusName]), getattr(numpy, _timesOperations[timesName])
+
+def arrayIterate(algebra, state, idA, adA):
+	plus, times = _operations(algebra)
+	n, m = state.shape
+	newState = numpy.empty_like(state)
+
+	blockSize = max(1, BLOCK_ENTRIES // max(1, n*m))
+	for start in range(0, n, blockSize):
+		rows = slice(start, start + blockSize)
+		candidates = times(adA[rows, :, None], state[None, :, :])
+		plus.reduce(candidates, axis=1, out=newState[rows])
+
+	plus(newState, idA, out=newState)
+	return newState
+
+def arraySolve(algebra, state, idA, adA, limit=1000):
+	return arraySolveDestinations(algebra, state, idA, adA, limit)[0]
+
+# Column j of the next state only depends on column j of the current one, so
+# once a column stops changing it is frozen and only the remaining active
+# columns are iterated. Also returns the time at which each column converged.
+def arraySolveDestinations(algebra, state, idA, adA, limit=1000):
+	states, _, convergenceTimes = arraySolveProfile(algebra, state, idA, adA, limit)
+	return states, convergenceTimes
+
+# Also returns the last time at which each entry changed
+def arraySolveProfile(algebra, state, idA, adA, limit=1000):
+	n = len(state)
+	states = [state]
+	active = numpy.arange(n)
+	lastChanges = numpy.zeros(state.shape, dtype=int)
+	convergenceTimes = [None for _ in range(n)]
+
+	while len(states) < limit and len(active):
+		newState = states[-1].copy()
+		newState[:, active] = arrayIterate(algebra, states[-1][:, active], idA[:, active], adA)
+
+		changedEntries = newState[:, active] != states[-1][:, active]
+		lastChanges[:, active] = numpy.where(changedEntries, len(states), lastChanges[:, active])
+
+		changed = numpy.any(changedEntries, axis=0)
+		for j in active[~changed].tolist():
+			convergenceTimes[j] = len(states) - 1
+		active = active[changed]
+		states.append(newState)
+
+	return states, lastChanges, convergenceTimes
+
+# As arraySolveDestinations, but only keeps the current state and returns the
+# convergence time (None if it hasn't converged within limit states or by the
+# deadline) in place of the states
+def arrayProbeDestinations(algebra, state, idA, adA, limit=1000, deadline=None):
+	n = len(state)
+	state = state.copy()
+	active = numpy.arange(n)
+	convergenceTimes = [None for _ in range(n)]
+
+	count = 1
+	while len(active):
+		if count >= limit or (deadline is not None and time.time() > deadline):
+			return None, convergenceTimes
+
+		newColumns = arrayIterate(algebra, state[:, active], idA[:, active], adA)
+		changed = numpy.any(newColumns != state[:, active], axis=0)
+		for j in active[~changed].tolist():
+			convergenceTimes[j] = count - 1
+		state[:, active] = newColumns
+		active = active[changed]
+		count += 1
+
+	return count - 2, convergenceTimes
+
+# As arrayProbeDestinations, but also stops as soon as a state recurs and
+# returns (prePeriod, period) in place of the convergence time, as
+# bellmanFord.probeCycle does
+def arrayProbeCycle(algebra, state, idA, adA, limit=1000, deadline=None):
+	n = len(state)
+	convergenceTimes = [None for _ in range(n)]
+
+	step = lambda s : arrayIterate(algebra, s, idA, adA)
+	detector = cycles.CycleDetector(lambda s : hash(s.tobytes()), numpy.array_equal)
+	detector.add(state)
+
+	start = state
+	count = 1
+	while True:
+		if count >= limit or (deadline is not None and time.time() > deadline):
+			return None, convergenceTimes
+
+		newState = step(state)
+		changed = numpy.any(newState != state, axis=0)
+		for j in numpy.nonzero(~changed)[0].tolist():
+			if convergenceTimes[j] is None:
+				convergenceTimes[j] = count - 1
+		if not changed.any():
+			return (count - 1, 1), convergenceTimes
+
+		state = newState
+		count += 1
+		if detector.add(state):
+			prePeriod = cycles.findPrePeriod(start, step, detector.period, numpy.array_equal)
+			return (prePeriod, detector.period), convergenceTimes
+
+# Drop-in replacements for the functions of the same name in bellmanFord
+
+def iterate(algebra, state, idM, adM):
+	newState = arrayIterate(algebra, toArray(algebra, state), toArray(algebra, idM), toArray(algebra, adM))
+	return toMatrix(newState)
+
+def iterateWithChanges(algebra, state, idM, adM):
+	stateA = toArray(algebra, state)
+	newStateA = arrayIterate(algebra, stateA, toArray(algebra, idM), toArray(algebra, adM))
+	changes = set(zip(*(indices.tolist() for indices in numpy.nonzero(newStateA != stateA))))
+	return toMatrix(newStateA), changes
+
+def solve(algebra, state, idM, adM, limit=1000):
+	return solveDestinations(algebra, state, idM, adM, limit)[0]
+
+def solveDestinations(algebra, state, idM, adM, limit=1000):
+	states, convergenceTimes = arraySolveDestinations(algebra, toArray(algebra, state), toArray(algebra, idM), toArray(algebra, adM), limit)
+	return [toMatrix(s) for s in states], convergenceTimes
+
+def convergenceTime(algebra, state, idM, adM, limit=1000, deadline=None):
+	return probeDestinations(algebra, state, idM, adM, limit, deadline)[0]
+
+def probeDestinations(algebra, state, idM, adM, limit=1000, deadline=None):
+	return arrayProbeDestinations(algebra, toArray(algebra, state), toArray(algebra, idM), toArray(algebra, adM), limit, deadline)
+
+def findCycle(algebra, state, idM, adM, limit=1000, deadline=None):
+	return probeCycle(algebra, state, idM, adM, limit, deadline)[0]
+
+def probeCycle(algebra, state, idM, adM, limit=1000, deadline=None):
+	return arrayProbeCycle(algebra, toArray(algebra, state), toArray(algebra, idM), toArray(algebra, adM), limit, deadline)
+
+#############
+## Batches
+
+# Iterates a batch of independent states at once, where states and adAs are
+# arrays of shape (B, n, n) holding B states and their adjacency matrices
+def batchIterate(algebra, states, idA, adAs):
+	plus, times = _operations(algebra)
+	b, n, m = states.shape
+	newStates = numpy.empty_like(states)
+
+	blockSize = max(1, BLOCK_ENTRIES // max(1, n*n*m))
+	for start in range(0, b, blockSize):
+		batch = slice(start, start + blockSize)
+		candidates = times(adAs[batch, :, :, None], states[batch, None, :, :])
+		plus.reduce(candidates, axis=2, out=newStates[batch])
+
+	plus(newStates, idA, out=newStates)
+	return newStates
+
+# The convergence time of each of the adjacency matrices in adAs as given by
+# convergenceTime, with None for those that haven't converged within limit
+# states. Instances that have converged are dropped from the batch so that
+# only the remaining ones are iterated.
+def batchConvergenceTimes(algebra, idA, adAs, limit=1000):
+	b = len(adAs)
+	states = numpy.repeat(idA[None, :, :], b, axis=0)
+	active = numpy.arange(b)
+	convergenceTimes = numpy.full(b, -1, dtype=int)
+
+	step = 0
+	while step < limit - 1 and len(active):
+		newStates = batchIterate(algebra, states, idA, adAs[active])
+		changed = numpy.any(newStates != states, axis=(1, 2))
+		convergenceTimes[active[~changed]] = step
+
+		active = active[changed]
+		states = newStates[changed]
+		step += 1
+
+	return [t if t >= 0 else None for t in convergenceTimes.tolist()]
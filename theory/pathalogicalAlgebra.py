@@ -1,4 +1,5 @@
 from theory.algebra import *
+from theory.paths import emptyTuplePath
 
 def plus(x, y):
 	if x is None:
@@ -37,11 +38,11 @@ def times(f, x, i, j):
 		return None
 
 	# Distributivity violation
-	if j % 2 == 0 and p == (j,j-1,0):
+	if j % 2 == 0 and len(p) == 3 and tuple(p) == (j,j-1,0):
 		return None
 
 	# Block routes from gadget leg
-	if j % 2 == 1 and p == (j,0) and i != j + 1:
+	if j % 2 == 1 and len(p) == 2 and tuple(p) == (j,0) and i != j + 1:
 		return None
 
 	# Only accept routes from preceeding neighbour in junk phase
@@ -52,7 +53,7 @@ def times(f, x, i, j):
 		nl = i
 	else:
 		nl = l
-	np = (i,) + p if p != () else (i,j)
+	np = p.extend(i) if p else emptyTuplePath.extend(j).extend(i)
 	return (nl , np)
 
 
@@ -61,10 +62,10 @@ pathalogicalAlgebra = DisplayAlgebra(
 	plus        		= plus,
 	times         		= times,
 	invalidRoute  		= None,
-	identityRoute 		= (0 , ()),
+	identityRoute 		= (0 , emptyTuplePath),
 	invalidEdge   		= None,
 	defaultEdge			= "e",
-	randomEdge          = lambda : "e",
+	randomEdge          = lambda rng=None : "e",
 	validateEdgeString 	= lambda f : f == "e",
 	parseEdgeString		= lambda x : x,
 	componentAlgebras	= []
@@ -0,0 +1,102 @@
+# Persistent paths built from shared-tail cons cells. Extending a path by a
+# node is O(1) and shares the existing path as its tail, while the cached
+# length, hash and bitmask of member nodes make length queries, hashing and
+# loop checks O(1) as well. Paths are ordered as lists of nodes would be.
+
+class Path():
+
+	__slots__ = ["head", "tail", "length", "mask", "_hash"]
+
+	def __init__(self, head=None, tail=None):
+		self.head = head
+		self.tail = tail
+		if tail is None:
+			self.length = 0
+			self.mask   = 0
+			self._hash  = hash(())
+		else:
+			self.length = tail.length + 1
+			self.mask   = tail.mask | (1 << head)
+			self._hash  = hash((head, tail._hash))
+
+	def extend(self, node):
+		return type(self)(node, self)
+
+	def __contains__(self, node):
+		return (self.mask >> node) & 1 == 1
+
+	def __len__(self):
+		return self.length
+
+	def __iter__(self):
+		path = self
+		while path.tail is not None:
+			yield path.head
+			path = path.tail
+
+	def __getitem__(self, index):
+		if index < 0:
+			index += self.length
+		if not 0 <= index < self.length:
+			raise IndexError("path index out of range")
+
+		path = self
+		for _ in range(index):
+			path = path.tail
+		return path.head
+
+	def __hash__(self):
+		return self._hash
+
+	def __eq__(self, other):
+		if not isinstance(other, Path):
+			return NotImplemented
+
+		p, q = self, other
+		while p is not q:
+			if p.length != q.length or p._hash != q._hash or p.head != q.head:
+				return False
+			p, q = p.tail, q.tail
+		return True
+
+	def __lt__(self, other):
+		if not isinstance(other, Path):
+			return NotImplemented
+
+		p, q = self, other
+		while p is not q:
+			if q.tail is None:
+				return False
+			if p.tail is None:
+				return True
+			if p.head != q.head:
+				return p.head < q.head
+			p, q = p.tail, q.tail
+		return False
+
+	def __repr__(self):
+		return repr(list(self))
+
+	def __reduce__(self):
+		return (createPath, (tuple(self), type(self)))
+
+# Paths displayed as tuples of nodes rather than lists, as the pathological
+# algebra's paths always have been
+class TuplePath(Path):
+
+	__slots__ = []
+
+	def __repr__(self):
+		return repr(tuple(self))
+
+emptyPath 		= Path()
+emptyTuplePath 	= TuplePath()
+
+Path.empty 		= emptyPath
+TuplePath.empty = emptyTuplePath
+
+def createPath(nodes, pathType=Path):
+	path = pathType.empty
+	for node in reversed(nodes):
+		path = path.extend(node)
+	return path
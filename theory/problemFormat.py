@@ -0,0 +1,298 @@
+import array
+import json
+import pickle
+import struct
+import sys
+
+# Binary storage format for routing problems and exploration topologies.
+#
+# The file consists of a fixed header followed by packed little-endian
+# arrays, each starting on an 8 byte boundary:
+#
+#   header      magic, version, kind, withPaths, #nodes, #edges, source
+#   algebra     length-prefixed UTF-8 algebra name (empty for topologies)
+#   weightType  how edge weights are stored (see below)
+#   positions   float64[2 * #nodes], the (x,y) position of each node
+#   sources     uint32[#edges]
+#   targets     uint32[#edges]
+#   weights     int64[#edges] or float64[#edges], or for any other weights
+#               uint32[#edges] indices into a table of distinct weights, each
+#               stored as JSON text (uint32 count, uint32[count+1] offsets,
+#               UTF-8 data)
+#   delays      uint8 flag for whether any edge has a message delay, then if
+#               set float64[#edges] delays, NaN for edges without one
+#
+# In the JSON text tuples and F-custom edge functions are tagged so that they
+# are read back as the same types (version 1 files stored them untagged).
+# Files before version 3 have no delays.
+# Nodes are stored numbered from 0 in the order of the node list.
+#
+# The whole file is read in one go and the arrays are then used in place.
+# Files that don't start with the magic bytes are treated as the pickled
+# dictionaries written by older versions.
+
+MAGIC   = b"PVRP"
+VERSION = 3
+
+ROUTING_PROBLEM = 0
+TOPOLOGY        = 1
+
+NO_WEIGHTS    = 0
+INT_WEIGHTS   = 1
+FLOAT_WEIGHTS = 2
+TABLE_WEIGHTS = 3
+
+_header = struct.Struct("<4sHBBIIq")
+
+def _padding(offset):
+	return -offset % 8
+
+#############
+## Writing
+
+def _weightType(weights):
+	if all(w is None for w in weights):
+		return NO_WEIGHTS
+	if all(type(w) is int and -2**63 <= w < 2**63 for w in weights):
+		return INT_WEIGHTS
+	# Mixed ints and floats are kept apart in the table
+	if all(type(w) is float for w in weights):
+		return FLOAT_WEIGHTS
+	return TABLE_WEIGHTS
+
+def _encodeWeight(weight):
+	from theory.algebraExamples import EdgeFunction
+
+	if weight is None or type(weight) in (bool, int, float, str):
+		return weight
+	if type(weight) is list:
+		return [_encodeWeight(w) for w in weight]
+	if type(weight) is tuple:
+		return {'tuple' : [_encodeWeight(w) for w in weight]}
+	if isinstance(weight, EdgeFunction):
+		return {'edgeFunction' : weight.string}
+	raise Exception("Edge weights of type " + type(weight).__name__ + " can't be saved")
+
+def _decodeWeight(value):
+	from theory.algebraExamples import compileEdgeFunction
+
+	if type(value) is list:
+		return [_decodeWeight(v) for v in value]
+	if type(value) is dict:
+		if 'tuple' in value:
+			return tuple(_decodeWeight(v) for v in value['tuple'])
+		if 'edgeFunction' in value:
+			return compileEdgeFunction(value['edgeFunction'])
+		raise Exception("Unknown edge weight " + str(value))
+	return value
+
+def _toLittleEndian(values):
+	if sys.byteorder == "big":
+		values.byteswap()
+	return values.tobytes()
+
+def encode(data):
+	if "algebra" in data:
+		kind      = ROUTING_PROBLEM
+		algebra   = data['algebra']
+		withPaths = data['withPaths']
+		source    = data['source']
+		positions = data['pos']
+	else:
+		kind      = TOPOLOGY
+		algebra   = ""
+		withPaths = False
+		source    = data['sourceNode']
+		positions = data['nodePositions']
+
+	nodes = [node['id'] for node in data['edgeList']['nodes']]
+	index = {node : i for i, node in enumerate(nodes)}
+	links = data['edgeList']['links']
+
+	weights = [link.get('weight') for link in links]
+	weightType = _weightType(weights)
+
+	sections = []
+	sections.append(_header.pack(MAGIC, VERSION, kind, withPaths, len(nodes), len(links), -1 if source is None else index[source]))
+	name = algebra.encode("utf-8")
+	sections.append(struct.pack("<H", len(name)) + name)
+	sections.append(struct.pack("<B", weightType))
+
+	sections.append(array.array("d", [float(c) for n in nodes for c in positions[n]]))
+	sections.append(array.array("I", [index[link['source']] for link in links]))
+	sections.append(array.array("I", [index[link['target']] for link in links]))
+
+	if weightType == INT_WEIGHTS:
+		sections.append(array.array("q", weights))
+	elif weightType == FLOAT_WEIGHTS:
+		sections.append(array.array("d", weights))
+	elif weightType == TABLE_WEIGHTS:
+		table = {}
+		indices = array.array("I", [table.setdefault(json.dumps(_encodeWeight(w)), len(table)) for w in weights])
+		texts = [text.encode("utf-8") for text in table]
+		offsets = array.array("I", [0])
+		for text in texts:
+			offsets.append(offsets[-1] + len(text))
+		sections.append(indices)
+		sections.append(struct.pack("<I", len(texts)))
+		sections.append(offsets)
+		sections.append(b"".join(texts))
+
+	delays = [link.get('delay') for link in links]
+	hasDelays = any(delay is not None for delay in delays)
+	sections.append(struct.pack("<B", hasDelays))
+	if hasDelays:
+		sections.append(array.array("d", [float("nan") if delay is None else float(delay) for delay in delays]))
+
+	# Lay out the sections, aligning the start of each array
+	result = bytearray()
+	for section in sections:
+		if isinstance(section, array.array):
+			result += bytes(_padding(len(result)))
+			section = _toLittleEndian(section)
+		result += section
+	return bytes(result)
+
+def writeProblemFile(filename, data):
+	with open(filename, 'wb') as file:
+		file.write(encode(data))
+
+#############
+## Reading
+
+class ProblemFile():
+
+	def __init__(self, buffer):
+		self._buffer = buffer
+		view = memoryview(buffer)
+
+		magic, version, self.kind, withPaths, self.nodeCount, self.edgeCount, source = _header.unpack_from(view, 0)
+		if magic != MAGIC:
+			raise Exception("Not a PathVision problem file")
+		if version > VERSION:
+			raise Exception("Problem file version " + str(version) + " is newer than this version of PathVision")
+		self.version = version
+		self.withPaths = bool(withPaths)
+		self.source = None if source == -1 else source
+
+		offset = _header.size
+		nameLength, = struct.unpack_from("<H", view, offset)
+		offset += 2
+		self.algebra = bytes(view[offset:offset+nameLength]).decode("utf-8")
+		offset += nameLength
+		self.weightType, = struct.unpack_from("<B", view, offset)
+		offset += 1
+
+		self._view = view
+		self._offset = offset
+
+		self.positions 	= self._readArray("d", 2*self.nodeCount)
+		self.sources 	= self._readArray("I", self.edgeCount)
+		self.targets 	= self._readArray("I", self.edgeCount)
+
+		if self.weightType == INT_WEIGHTS:
+			self.weights = self._readArray("q", self.edgeCount)
+		elif self.weightType == FLOAT_WEIGHTS:
+			self.weights = self._readArray("d", self.edgeCount)
+		elif self.weightType == TABLE_WEIGHTS:
+			indices = self._readArray("I", self.edgeCount)
+			count, = struct.unpack_from("<I", view, self._offset)
+			self._offset += 4
+			offsets = self._readArray("I", count + 1)
+			texts = bytes(view[self._offset:self._offset+offsets[-1]])
+			self._offset += offsets[-1]
+			table = [json.loads(texts[offsets[i]:offsets[i+1]]) for i in range(count)]
+			if version >= 2:
+				table = [_decodeWeight(value) for value in table]
+			self.weights = [table[i] for i in indices]
+		else:
+			self.weights = [None]*self.edgeCount
+
+		self.delays = None
+		if version >= 3:
+			hasDelays, = struct.unpack_from("<B", view, self._offset)
+			self._offset += 1
+			if hasDelays:
+				self.delays = self._readArray("d", self.edgeCount)
+
+	# Returns a view of the next array in the file, which only requires a
+	# copy if the machine is big-endian
+	def _readArray(self, typecode, length):
+		size = array.array(typecode).itemsize
+		self._offset += _padding(self._offset)
+		section = self._view[self._offset:self._offset + size*length]
+		self._offset += size*length
+
+		if sys.byteorder == "big":
+			values = array.array(typecode, bytes(section))
+			values.byteswap()
+			return values
+		return section.cast(typecode)
+
+	def _link(self, e):
+		link = {'source' : self.sources[e], 'target' : self.targets[e]}
+		if self.weights[e] is not None:
+			link['weight'] = self.weights[e]
+		if self.delays is not None and self.delays[e] == self.delays[e]:
+			link['delay'] = self.delays[e]
+		return link
+
+	# The dictionary in the form produced by the storage callbacks
+	def toSaveData(self):
+		edgeList = {
+			'directed'		: True,
+			'multigraph'	: False,
+			'graph'			: {},
+			'nodes'			: [{'id' : n} for n in range(self.nodeCount)],
+			'links'			: [self._link(e) for e in range(self.edgeCount)]
+		}
+		positions = {n : [self.positions[2*n], self.positions[2*n+1]] for n in range(self.nodeCount)}
+
+		if self.kind == ROUTING_PROBLEM:
+			return {
+				'edgeList' 	: edgeList,
+				'pos' 		: positions,
+				'source' 	: self.source,
+				'algebra' 	: self.algebra,
+				'withPaths' : self.withPaths
+			}
+		return {
+			'edgeList' 		: edgeList,
+			'nodePositions' : positions,
+			'sourceNode'	: self.source
+		}
+
+def isProblemFile(filename):
+	with open(filename, 'rb') as file:
+		return file.read(len(MAGIC)) == MAGIC
+
+def readProblemFile(filename):
+	with open(filename, 'rb') as file:
+		return ProblemFile(file.read())
+
+# Old pickled files stored F-custom edge functions as strings, which are
+# compiled as they would have been when the edge was created
+def _compileEdgeFunctions(data):
+	from theory.algebraExamples import compileEdgeFunction, fRing, fVerify
+
+	def compile(weight):
+		if type(weight) is str and fVerify(weight):
+			return compileEdgeFunction(weight)
+		if type(weight) in (list, tuple):
+			return type(weight)(compile(w) for w in weight)
+		return weight
+
+	if fRing.name in data.get('algebra', ""):
+		for link in data['edgeList']['links']:
+			if 'weight' in link:
+				link['weight'] = compile(link['weight'])
+	return data
+
+# Loads the save dictionary from either format. Old pickled files should
+# only be opened from trusted sources.
+def loadSaveData(filename):
+	if isProblemFile(filename):
+		return readProblemFile(filename).toSaveData()
+
+	with open(filename, 'rb') as file:
+		return _compileEdgeFunctions(pickle.load(file))
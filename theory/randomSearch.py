@@ -0,0 +1,89 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import theory.bellmanFord as bellmanFord
+import theory.numericBellmanFord as numericBellmanFord
+
+# Searches for random routing problems that take a long time to converge.
+# The trials are split into chunks that are scored in separate processes,
+# each chunk with its own seed. Every instance is generated by seeding the
+# random number generator from the chunk's seed and the index of the trial
+# within the chunk, so any instance found can be regenerated from just
+# (seed, trial).
+
+CHUNK_SIZE = 50
+
+# Numeric algebras score whole chunks at once, so use larger chunks
+BATCH_SIZE = 2000
+
+# Instances are scored by their convergence time. Those that haven't
+# converged within SEARCH_LIMIT states outrank all that have, and those found
+# to oscillate forever outrank them in turn.
+SEARCH_LIMIT 		= 1000
+NOT_CONVERGED_SCORE = SEARCH_LIMIT - 1
+OSCILLATING_SCORE 	= SEARCH_LIMIT
+
+def createRandomAdjacencyMatrix(algebra, size, rng=random):
+	return [[algebra.randomEdge(rng) if i != j else algebra.invalidEdge
+				for i in range(size)]
+					for j in range(size)]
+
+def generateInstance(algebra, size, seed, trial):
+	return createRandomAdjacencyMatrix(algebra, size, random.Random(seed * 2**32 + trial))
+
+def toScore(convergenceTime):
+	return NOT_CONVERGED_SCORE if convergenceTime is None else convergenceTime
+
+# Scores the (prePeriod, period) returned by findCycle
+def cycleScore(cycle):
+	if cycle is None:
+		return NOT_CONVERGED_SCORE
+	prePeriod, period = cycle
+	return prePeriod if period == 1 else OSCILLATING_SCORE
+
+def calculateScore(algebra, idM, adM):
+	engine = numericBellmanFord if numericBellmanFord.isApplicable(algebra) else bellmanFord
+	return cycleScore(engine.findCycle(algebra, idM, idM, adM, SEARCH_LIMIT))
+
+# For numeric algebras all the instances are solved together as a batch.
+# Otherwise they are solved in parallel if an executor is given.
+def calculateScores(algebra, idM, adMs, executor=None):
+	if numericBellmanFord.isApplicable(algebra) and adMs:
+		idA = numericBellmanFord.toArray(algebra, idM)
+		adAs = numericBellmanFord.numpy.array([numericBellmanFord.toArray(algebra, adM) for adM in adMs])
+		return [toScore(t) for t in numericBellmanFord.batchConvergenceTimes(algebra, idA, adAs, SEARCH_LIMIT)]
+	if executor is not None and len(adMs) > 1:
+		return list(executor.map(calculateScore, [algebra]*len(adMs), [idM]*len(adMs), adMs))
+	return [calculateScore(algebra, idM, adM) for adM in adMs]
+
+# Returns (seed, trial, score) for the best of the given trials, along with
+# the number of trials run
+def searchChunk(algebra, size, seed, trials):
+	idM = bellmanFord.createIdentityMatrix(algebra, size)
+	scores = calculateScores(algebra, idM, [generateInstance(algebra, size, seed, trial) for trial in range(trials)])
+
+	bestScore, bestTrial = -1, None
+	for trial, score in enumerate(scores):
+		if score > bestScore:
+			bestScore, bestTrial = score, trial
+	return seed, bestTrial, bestScore, trials
+
+def createChunks(algebra, totalRuns, seed, workers):
+	maxChunkSize = BATCH_SIZE if numericBellmanFord.isApplicable(algebra) else CHUNK_SIZE
+	chunkSize = max(1, min(maxChunkSize, totalRuns // (4*workers)))
+	seeds = random.Random(seed)
+	return [(seeds.getrandbits(32), min(chunkSize, totalRuns - start)) for start in range(0, totalRuns, chunkSize)]
+
+# Generates the results of searchChunk for every chunk as they complete.
+# Closing the generator cancels any chunks that haven't yet started.
+def search(algebra, size, chunks, workers=None):
+	workers = workers or os.cpu_count() or 1
+
+	executor = ProcessPoolExecutor(workers)
+	try:
+		futures = [executor.submit(searchChunk, algebra, size, seed, trials) for seed, trials in chunks]
+		for future in as_completed(futures):
+			yield future.result()
+	finally:
+		executor.shutdown(cancel_futures=True)
@@ -0,0 +1,40 @@
+import theory.problemFormat as problemFormat
+from theory.algebra import DisplayAlgebra
+from theory.algebraExamples import findAlgebra
+
+# Routing problems as saved by the simulation mode's StorageController: a
+# dictionary holding the networkx node-link data of the graph, the node
+# positions, the source node and the algebra (see problemFormat for how it
+# is stored). These functions only depend on the theory package so problems
+# can be solved without a GUI.
+
+def loadProblem(filename):
+	return problemFormat.loadSaveData(filename)
+
+def problemAlgebra(data):
+	algebra = findAlgebra(data['algebra'])
+	if data['withPaths']:
+		algebra = DisplayAlgebra.trackPaths(algebra)
+	return algebra
+
+def problemSize(data):
+	return len(data['edgeList']['nodes'])
+
+def problemAdjacencyMatrix(algebra, data):
+	size = problemSize(data)
+	adM = [[algebra.invalidEdge for _ in range(size)] for _ in range(size)]
+	for link in data['edgeList']['links']:
+		adM[link['source']][link['target']] = link['weight']
+	return adM
+
+# The neighbour lists of bellmanFord.adjacencyMatrixToNeighbourLists, built
+# without the full adjacency matrix
+def problemNeighbourLists(algebra, data):
+	neighbours = [{} for _ in range(problemSize(data))]
+	for link in data['edgeList']['links']:
+		neighbours[link['source']][link['target']] = link['weight']
+	return [sorted((k, e) for k, e in row.items() if e != algebra.invalidEdge) for row in neighbours]
+
+# The message delay of each link that has one, as used by eventSimulator
+def problemDelays(data):
+	return {(link['source'], link['target']) : link['delay'] for link in data['edgeList']['links'] if 'delay' in link}
@@ -0,0 +1,161 @@
+import collections
+import itertools
+import math
+import os
+import pickle
+
+# A cache of the convergence times of routing problems, keyed by a canonical
+# form of the problem so that isomorphic graphs share a single entry.
+#
+# The canonical form relabels the nodes in an order that only depends on the
+# structure of the weighted graph. Nodes are first partitioned by colour
+# refinement, and then every ordering of the nodes within each class is tried
+# and the smallest resulting matrix kept. If that would mean trying more than
+# PERMUTATION_LIMIT orderings, or the algebra's operations depend on the node
+# ids, the problem is keyed by its labelled matrix instead. Equal keys always
+# mean equal problems up to relabelling, so cached scores are never wrong,
+# only sometimes missed.
+#
+# Alongside each score the cache can hold the convergence time of every
+# destination, stored in canonical order and mapped back to the labels of
+# whichever isomorphic graph is being looked up.
+#
+# Scores depend on the step limit of the solves and on how instances are
+# scored, so both the limit and CACHE_VERSION are part of every key and are
+# recorded in the saved file. Files saved with a different version or limit,
+# or that can't be read, are ignored. CACHE_VERSION must be increased
+# whenever the scores of existing instances change.
+
+PERMUTATION_LIMIT = 720
+
+CACHE_VERSION = 2
+
+def _weightKey(weight):
+	return repr(weight)
+
+# Repeatedly splits the nodes by the colours of their neighbours along edges
+# of each weight until the partition is stable
+def _refineColours(weights):
+	n = len(weights)
+	colours = [0 for _ in range(n)]
+	classes = 1
+
+	while True:
+		signatures = [(
+			colours[i],
+			weights[i][i],
+			tuple(sorted((weights[i][k], colours[k]) for k in range(n) if k != i)),
+			tuple(sorted((weights[k][i], colours[k]) for k in range(n) if k != i))
+		) for i in range(n)]
+
+		order = sorted(set(signatures))
+		colours = [order.index(signature) for signature in signatures]
+		if len(order) == classes:
+			return colours
+		classes = len(order)
+
+# Returns the canonical form together with the node placed at each position
+def canonicalOrder(algebra, adM):
+	n = len(adM)
+	weights = [[_weightKey(w) for w in row] for row in adM]
+	labelled = (tuple(map(tuple, weights)), list(range(n)))
+	if not algebra.labelIndependent:
+		return labelled
+
+	colours = _refineColours(weights)
+	cells = [[i for i in range(n) if colours[i] == c] for c in range(max(colours, default=-1) + 1)]
+	if math.prod(math.factorial(len(cell)) for cell in cells) > PERMUTATION_LIMIT:
+		return labelled
+
+	best = None
+	for orderings in itertools.product(*(itertools.permutations(cell) for cell in cells)):
+		order = [i for ordering in orderings for i in ordering]
+		matrix = tuple(tuple(weights[i][k] for k in order) for i in order)
+		if best is None or matrix < best[0]:
+			best = (matrix, order)
+	return best
+
+# Saved caches only hold builtin values, so refuse to load anything else
+class _CacheUnpickler(pickle.Unpickler):
+
+	def find_class(self, module, name):
+		raise pickle.UnpicklingError("Unexpected object in score cache")
+
+class ScoreCache():
+
+	def __init__(self, capacity, filename=None, limit=None):
+		self.capacity 	= capacity
+		self.filename 	= filename
+		self.limit 		= limit
+		self.hits 		= 0
+		self.lookups 	= 0
+		self._scores 	= collections.OrderedDict()
+
+		if filename and os.path.exists(filename):
+			self._scores.update(self._load(filename))
+
+	# Returns the key for the problem and the order relating its nodes to
+	# those of the canonical form
+	def key(self, algebra, adM):
+		form, order = canonicalOrder(algebra, adM)
+		return (CACHE_VERSION, self.limit, algebra.name, form), order
+
+	# Returns the cached (score, destinationTimes), or None if there isn't
+	# one. The destination times are None if they weren't stored.
+	def get(self, key, order):
+		self.lookups += 1
+		entry = self._scores.get(key)
+		if entry is None:
+			return None
+
+		self.hits += 1
+		self._scores.move_to_end(key)
+		score, canonicalTimes = entry
+		if canonicalTimes is None:
+			return score, None
+
+		destinationTimes = [None for _ in order]
+		for position, node in enumerate(order):
+			destinationTimes[node] = canonicalTimes[position]
+		return score, destinationTimes
+
+	def put(self, key, order, score, destinationTimes=None):
+		canonicalTimes = None
+		if destinationTimes is not None:
+			canonicalTimes = tuple(destinationTimes[node] for node in order)
+		elif key in self._scores:
+			canonicalTimes = self._scores[key][1]
+
+		self._scores[key] = (score, canonicalTimes)
+		self._scores.move_to_end(key)
+		while len(self._scores) > self.capacity:
+			self._scores.popitem(last=False)
+
+	def hitRate(self):
+		return self.hits / self.lookups if self.lookups else 0.0
+
+	def resetStatistics(self):
+		self.hits 	 = 0
+		self.lookups = 0
+
+	def save(self):
+		if self.filename:
+			os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+			with open(self.filename, 'wb') as file:
+				pickle.dump({'version' : CACHE_VERSION, 'limit' : self.limit, 'scores' : dict(self._scores)}, file)
+
+	# The scores saved in the file, or none if it is from another version or
+	# limit or is corrupt
+	def _load(self, filename):
+		try:
+			with open(filename, 'rb') as file:
+				data = _CacheUnpickler(file).load()
+		except Exception:
+			return {}
+
+		if not isinstance(data, dict) or data.get('version') != CACHE_VERSION or data.get('limit') != self.limit:
+			return {}
+		scores = data.get('scores')
+		if not isinstance(scores, dict):
+			return {}
+		return scores
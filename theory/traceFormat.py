@@ -0,0 +1,230 @@
+import array
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+
+from theory.algebra import routeKey
+from theory.paths import Path, TuplePath, createPath
+
+# Append-only on-disk traces of simulations. After a short header, and the
+# settings of the simulation as length-prefixed JSON padded to 8 bytes (the
+# algebra's name, the schedule and the number of steps in a sweep of it),
+# the trace file holds one fixed-size record per state, each containing the n*n
+# entries of the state in row-major order. For numeric algebras the entries
+# are stored directly as float64s. Otherwise they are uint32 indices into a
+# table of distinct routes, which is kept in a separate file alongside the
+# trace (one JSON encoded route per line, appended when first seen).
+# Traces are read back by memory mapping the trace file, so only the states
+# that are actually looked at are decoded. Version 1 traces have no settings.
+
+MAGIC   = b"PVTR"
+VERSION = 2
+
+NUMERIC_RECORDS  = 0
+INTERNED_RECORDS = 1
+
+VALUES_SUFFIX = ".values"
+
+_header = struct.Struct("<4sHBxI4x")
+
+###########
+## Routes
+
+# Paths are tagged with their class, as different classes display differently
+_pathTypes = {"path" : Path, "tuplePath" : TuplePath}
+_pathTags = {pathType : tag for tag, pathType in _pathTypes.items()}
+
+def encodeRoute(value):
+	if value is None or isinstance(value, (bool, int, str)):
+		return value
+	if isinstance(value, float):
+		return value if math.isfinite(value) else {"float" : repr(value)}
+	if isinstance(value, tuple):
+		return [encodeRoute(v) for v in value]
+	if isinstance(value, list):
+		return {"list" : [encodeRoute(v) for v in value]}
+	if type(value) in _pathTags:
+		return {_pathTags[type(value)] : list(value)}
+	raise Exception("Cannot store routes of type " + type(value).__name__ + " in a trace")
+
+def decodeRoute(value):
+	if isinstance(value, list):
+		return tuple(decodeRoute(v) for v in value)
+	if isinstance(value, dict):
+		if "float" in value:
+			return float(value["float"])
+		if "list" in value:
+			return [decodeRoute(v) for v in value["list"]]
+		(tag, nodes), = value.items()
+		return createPath(nodes, _pathTypes[tag])
+	return value
+
+def _toValue(v):
+	return int(v) if v.is_integer() else v
+
+#############
+## Writing
+
+class TraceWriter():
+
+	def __init__(self, filename, size, numeric, algebra=None, schedule=None, sweep=1):
+		self.size 		= size
+		self.numeric 	= numeric
+		self._file 		= open(filename, 'wb')
+		self._file.write(_header.pack(MAGIC, VERSION, NUMERIC_RECORDS if numeric else INTERNED_RECORDS, size))
+
+		settings = json.dumps({"algebra" : algebra, "schedule" : schedule, "sweep" : sweep}).encode("utf-8")
+		settings = struct.pack("<I", len(settings)) + settings
+		self._file.write(settings + bytes(-len(settings) % 8))
+
+		if not numeric:
+			self._routeIDs 		= {}
+			self._valuesFile 	= open(filename + VALUES_SUFFIX, 'w')
+
+	def append(self, state):
+		if self.numeric:
+			record = array.array("d", [v for row in state for v in row])
+		else:
+			record = array.array("I", [self._routeID(v) for row in state for v in row])
+			self._valuesFile.flush()
+
+		if sys.byteorder == "big":
+			record.byteswap()
+		self._file.write(record.tobytes())
+		self._file.flush()
+
+	def close(self):
+		self._file.close()
+		if not self.numeric:
+			self._valuesFile.close()
+
+	def _routeID(self, route):
+		key = routeKey(route)
+		routeID = self._routeIDs.get(key)
+		if routeID is None:
+			routeID = self._routeIDs[key] = len(self._routeIDs)
+			self._valuesFile.write(json.dumps(encodeRoute(route)) + "\n")
+		return routeID
+
+#############
+## Reading
+
+# A read-only sequence of the states in a trace. The trace may still be
+# being written, in which case newly appended states are picked up as they
+# are requested.
+class TraceReader():
+
+	def __init__(self, filename):
+		self._filename 	= filename
+		self._file 		= open(filename, 'rb')
+
+		magic, version, recordType, self.size = _header.unpack(self._file.read(_header.size))
+		if magic != MAGIC:
+			raise Exception("Not a PathVision trace file")
+		if version > VERSION:
+			raise Exception("Trace file version " + str(version) + " is newer than this version of PathVision")
+
+		settings = {}
+		self._start = _header.size
+		if version >= 2:
+			length, = struct.unpack("<I", self._file.read(4))
+			settings = json.loads(self._file.read(length).decode("utf-8"))
+			self._start += 4 + length + (-(4 + length) % 8)
+		self.algebra 	= settings.get("algebra")
+		self.schedule 	= settings.get("schedule")
+		self.sweep 		= settings.get("sweep", 1)
+
+		self.numeric 	= recordType == NUMERIC_RECORDS
+		self._typecode 	= "d" if self.numeric else "I"
+		self._recordSize = self.size * self.size * array.array(self._typecode).itemsize
+
+		self._routes 	= []
+		self._valuesFile = None if self.numeric else open(filename + VALUES_SUFFIX, 'r')
+
+		self._map = None
+		self._mappedCount = 0
+		self._remap()
+
+	def __len__(self):
+		if self._recordSize == 0:
+			return 0
+		return (os.fstat(self._file.fileno()).st_size - self._start) // self._recordSize
+
+	def __getitem__(self, time):
+		if time < 0:
+			time += len(self)
+		if time >= self._mappedCount:
+			self._remap()
+		if not 0 <= time < self._mappedCount:
+			raise IndexError("trace index out of range")
+
+		start = self._start + time * self._recordSize
+		record = memoryview(self._map)[start:start + self._recordSize]
+		if sys.byteorder == "big":
+			values = array.array(self._typecode, bytes(record))
+			values.byteswap()
+		else:
+			values = record.cast(self._typecode)
+
+		n = self.size
+		if self.numeric:
+			entries = [_toValue(v) for v in values]
+		else:
+			self._readRoutes()
+			entries = [self._routes[i] for i in values]
+		del values, record
+
+		return [entries[i*n:(i+1)*n] for i in range(n)]
+
+	def close(self):
+		if self._map is not None:
+			self._map.close()
+		self._file.close()
+		if self._valuesFile is not None:
+			self._valuesFile.close()
+
+	def _remap(self):
+		if self._map is not None:
+			self._map.close()
+		self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		self._mappedCount = (len(self._map) - self._start) // self._recordSize if self._recordSize else 0
+
+	def _readRoutes(self):
+		for line in self._valuesFile:
+			self._routes.append(decodeRoute(json.loads(line)))
+
+# Stores the states of a simulation as they are computed in a trace file
+# rather than in memory. Behaves like the list of states it replaces.
+class RecordedTrace():
+
+	def __init__(self, filename, size, numeric, algebra=None, schedule=None, sweep=1):
+		self._filename 	= filename
+		self._writer 	= TraceWriter(filename, size, numeric, algebra, schedule, sweep)
+		self._reader 	= None
+		self._count 	= 0
+		self._last 		= None
+
+	def append(self, state):
+		self._writer.append(state)
+		self._count += 1
+		self._last = state
+
+	def __len__(self):
+		return self._count
+
+	def __getitem__(self, time):
+		if time < 0:
+			time += self._count
+		if time == self._count - 1:
+			return self._last
+		if self._reader is None:
+			self._reader = TraceReader(self._filename)
+		return self._reader[time]
+
+	def close(self):
+		self._writer.close()
+		if self._reader is not None:
+			self._reader.close()